@@ -10,8 +10,10 @@ from alembic import context
 sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.database import Base
-from app.models.task import Task
+from app.models.task import Task, TaskArchive
 from app.models.api_key import APIKey
+from app.models.task_stats import TaskCounters, TaskDailyStats
+from app.models.background_job import BackgroundJob
 from app.config import get_settings
 
 settings = get_settings()
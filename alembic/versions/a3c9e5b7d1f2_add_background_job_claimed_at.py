@@ -0,0 +1,26 @@
+"""Add claimed_at to background jobs
+
+Revision ID: a3c9e5b7d1f2
+Revises: f4b8d2a6c9e1
+Create Date: 2025-12-08 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e5b7d1f2'
+down_revision: Union[str, None] = 'f4b8d2a6c9e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('background_jobs', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('background_jobs', 'claimed_at')
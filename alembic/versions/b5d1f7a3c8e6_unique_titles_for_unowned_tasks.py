@@ -0,0 +1,41 @@
+"""Enforce unique titles for unowned tasks
+
+Revision ID: b5d1f7a3c8e6
+Revises: a3c9e5b7d1f2
+Create Date: 2025-12-09 10:00:00.000000
+
+UNIQUE(owner_key_id, title) treats NULL owners as distinct, so unowned tasks
+(including every task that predates ownership) could share a title. The
+constraint moves to a generated owner_scope = COALESCE(owner_key_id, 0)
+column. Rename duplicate unowned titles before upgrading, e.g. find them with:
+
+    SELECT title, COUNT(*) FROM tasks WHERE owner_key_id IS NULL
+    GROUP BY title HAVING COUNT(*) > 1;
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1f7a3c8e6'
+down_revision: Union[str, None] = 'a3c9e5b7d1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'tasks',
+        sa.Column('owner_scope', sa.Integer(), sa.Computed('COALESCE(owner_key_id, 0)', persisted=True), nullable=False)
+    )
+    op.create_unique_constraint('uq_tasks_owner_scope_title', 'tasks', ['owner_scope', 'title'])
+    op.drop_constraint('uq_tasks_owner_title', 'tasks', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint('uq_tasks_owner_title', 'tasks', ['owner_key_id', 'title'])
+    op.drop_constraint('uq_tasks_owner_scope_title', 'tasks', type_='unique')
+    op.drop_column('tasks', 'owner_scope')
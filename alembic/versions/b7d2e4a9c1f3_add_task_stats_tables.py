@@ -0,0 +1,63 @@
+"""Add task statistics tables and completed_at
+
+Revision ID: b7d2e4a9c1f3
+Revises: f31641b1b0b3
+Create Date: 2025-11-03 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4a9c1f3'
+down_revision: Union[str, None] = 'f31641b1b0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        "UPDATE tasks SET completed_at = COALESCE(updated_at, created_at) "
+        "WHERE completed = 1"
+    )
+
+    op.create_table('task_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('task_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    # Seed from existing rows; afterwards writes keep them current
+    op.execute(
+        "INSERT INTO task_counters (id, total, completed) "
+        "SELECT 1, COUNT(*), COALESCE(SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END), 0) "
+        "FROM tasks"
+    )
+    op.execute(
+        "INSERT INTO task_daily_stats (day, created, completed) "
+        "SELECT day, SUM(created), SUM(completed) FROM ("
+        "  SELECT DATE(created_at) AS day, 1 AS created, 0 AS completed "
+        "  FROM tasks WHERE created_at IS NOT NULL"
+        "  UNION ALL"
+        "  SELECT DATE(completed_at) AS day, 0 AS created, 1 AS completed "
+        "  FROM tasks WHERE completed = 1 AND completed_at IS NOT NULL"
+        ") AS events GROUP BY day"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_daily_stats')
+    op.drop_table('task_counters')
+    op.drop_column('tasks', 'completed_at')
@@ -0,0 +1,119 @@
+"""Add per-API-key task ownership
+
+Revision ID: d9f3b6c2e7a4
+Revises: c4e8a1d6f2b5
+Create Date: 2025-11-17 14:00:00.000000
+
+Existing tasks get no owner (owner_key_id NULL) and are not visible to any
+API key until assigned, e.g.:
+
+    UPDATE tasks SET owner_key_id = <api key id> WHERE owner_key_id IS NULL;
+
+followed by `python -m app.jobs.reconcile_stats`.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f3b6c2e7a4'
+down_revision: Union[str, None] = 'c4e8a1d6f2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('owner_key_id', sa.Integer(), nullable=True))
+
+    # Indexes lead with the owner; created before the foreign key so MySQL
+    # uses them for it instead of adding a separate index
+    op.create_index('ix_tasks_owner_created', 'tasks', ['owner_key_id', 'created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_tasks_owner_completed_created', 'tasks',
+        ['owner_key_id', 'completed', 'created_at', 'id'], unique=False
+    )
+    op.create_foreign_key('fk_tasks_owner_key_id', 'tasks', 'api_keys', ['owner_key_id'], ['id'])
+
+    # Titles are unique per owner rather than globally
+    op.drop_index('ix_tasks_title', table_name='tasks')
+    op.create_unique_constraint('uq_tasks_owner_title', 'tasks', ['owner_key_id', 'title'])
+
+    # Stats become per owner; unowned tasks are counted under owner_key_id 0
+    op.drop_table('task_daily_stats')
+    op.drop_table('task_counters')
+    op.create_table('task_counters',
+    sa.Column('owner_key_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('owner_key_id')
+    )
+    op.create_table('task_daily_stats',
+    sa.Column('owner_key_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('owner_key_id', 'day')
+    )
+    op.execute(
+        "INSERT INTO task_counters (owner_key_id, total, completed) "
+        "SELECT COALESCE(owner_key_id, 0), COUNT(*), "
+        "COALESCE(SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END), 0) "
+        "FROM tasks GROUP BY COALESCE(owner_key_id, 0)"
+    )
+    op.execute(
+        "INSERT INTO task_daily_stats (owner_key_id, day, created, completed) "
+        "SELECT owner_key_id, day, SUM(created), SUM(completed) FROM ("
+        "  SELECT COALESCE(owner_key_id, 0) AS owner_key_id, DATE(created_at) AS day, "
+        "         1 AS created, 0 AS completed "
+        "  FROM tasks WHERE created_at IS NOT NULL"
+        "  UNION ALL"
+        "  SELECT COALESCE(owner_key_id, 0) AS owner_key_id, DATE(completed_at) AS day, "
+        "         0 AS created, 1 AS completed "
+        "  FROM tasks WHERE completed = 1 AND completed_at IS NOT NULL"
+        ") AS events GROUP BY owner_key_id, day"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_daily_stats')
+    op.drop_table('task_counters')
+    op.create_table('task_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('task_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.execute(
+        "INSERT INTO task_counters (id, total, completed) "
+        "SELECT 1, COUNT(*), COALESCE(SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END), 0) "
+        "FROM tasks"
+    )
+    op.execute(
+        "INSERT INTO task_daily_stats (day, created, completed) "
+        "SELECT day, SUM(created), SUM(completed) FROM ("
+        "  SELECT DATE(created_at) AS day, 1 AS created, 0 AS completed "
+        "  FROM tasks WHERE created_at IS NOT NULL"
+        "  UNION ALL"
+        "  SELECT DATE(completed_at) AS day, 0 AS created, 1 AS completed "
+        "  FROM tasks WHERE completed = 1 AND completed_at IS NOT NULL"
+        ") AS events GROUP BY day"
+    )
+
+    # Fails if two owners share a title; rename duplicates before downgrading
+    op.drop_constraint('uq_tasks_owner_title', 'tasks', type_='unique')
+    op.create_index('ix_tasks_title', 'tasks', ['title'], unique=True)
+    op.drop_constraint('fk_tasks_owner_key_id', 'tasks', type_='foreignkey')
+    op.drop_index('ix_tasks_owner_completed_created', table_name='tasks')
+    op.drop_index('ix_tasks_owner_created', table_name='tasks')
+    op.drop_column('tasks', 'owner_key_id')
@@ -0,0 +1,59 @@
+"""Add tasks archive table
+
+Revision ID: e2a7c5f1d8b3
+Revises: d9f3b6c2e7a4
+Create Date: 2025-11-24 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5f1d8b3'
+down_revision: Union[str, None] = 'd9f3b6c2e7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tasks_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner_key_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['owner_key_id'], ['api_keys.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_tasks_archive_owner_created', 'tasks_archive',
+        ['owner_key_id', 'created_at', 'id'], unique=False
+    )
+    # Lets the archive job find old completed tasks without scanning tasks
+    op.create_index('ix_tasks_completed_at', 'tasks', ['completed_at'], unique=False)
+    op.add_column(
+        'task_counters',
+        sa.Column('archived', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    # Move archived tasks back so no data is lost
+    op.execute(
+        "INSERT INTO tasks (id, owner_key_id, title, description, completed, "
+        "created_at, updated_at, completed_at) "
+        "SELECT id, owner_key_id, title, description, completed, "
+        "created_at, updated_at, completed_at FROM tasks_archive"
+    )
+    op.execute("UPDATE task_counters SET archived = 0")
+    op.drop_column('task_counters', 'archived')
+    op.drop_index('ix_tasks_completed_at', table_name='tasks')
+    op.drop_index('ix_tasks_archive_owner_created', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
@@ -0,0 +1,29 @@
+"""Add version to task counters
+
+Revision ID: f4b8d2a6c9e1
+Revises: e2a7c5f1d8b3
+Create Date: 2025-12-01 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d2a6c9e1'
+down_revision: Union[str, None] = 'e2a7c5f1d8b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'task_counters',
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('task_counters', 'version')
@@ -7,6 +7,68 @@ class Settings(BaseSettings):
     database_host: str = "localhost"
     database_port: int = 3306
     database_name: str
+    # Compiled SQL statements cached per engine (SQLAlchemy's default is 500)
+    database_query_cache_size: int = 500
+
+    # Response compression
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # HTTP caching (Cache-Control header values)
+    cache_control_task_reads: str = "private, max-age=0, must-revalidate"
+    cache_control_writes: str = "no-store"
+    cache_control_api_keys: str = "no-store"
+
+    # Background jobs: "memory" (in-process workers), "database" or "inline"
+    job_queue_backend: str = "memory"
+    job_workers: int = 2
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 1.0
+    job_poll_interval_seconds: float = 1.0
+    job_memory_queue_size: int = 10000
+    # A "running" database job not finished within this many seconds is
+    # assumed lost with its worker and is claimed again
+    job_lease_seconds: float = 600.0
+    # Finished (done/failed) database jobs are deleted after this long
+    job_retention_hours: float = 24.0
+    job_purge_interval_seconds: float = 3600.0
+    # API key last_used_at is updated at most once per this many seconds
+    api_key_last_used_resolution_seconds: int = 60
+
+    # Archival of completed tasks to tasks_archive
+    archive_after_days: int = 90
+    archive_batch_size: int = 1000
+
+    # In-memory, pre-serialized first page of GET /items/ per API key. When
+    # enabled, every task edit bumps the owner's counters version; keep the
+    # setting the same in all processes sharing a database. Memory is capped
+    # by owners and by bytes of task JSON; first pages holding a task larger
+    # than max_entry_bytes are always read from the database
+    first_page_snapshot_enabled: bool = True
+    first_page_snapshot_size: int = 10
+    first_page_snapshot_max_owners: int = 10000
+    first_page_snapshot_max_bytes: int = 64 * 1024 * 1024
+    first_page_snapshot_max_entry_bytes: int = 16 * 1024
+
+    # Concurrency limits per route class and load shedding
+    concurrency_limit_enabled: bool = True
+    concurrency_read_limit: int = 40
+    concurrency_write_limit: int = 20
+    concurrency_admin_limit: int = 5
+    concurrency_min_limit: int = 1
+    concurrency_max_queue: int = 50
+    concurrency_target_db_latency_ms: int = 50
+    request_timeout_seconds: float = 10.0
+    load_shed_retry_after_seconds: int = 1
+
+    # Per-request profiling: "X-Profile: <token>" header (disabled when empty)
+    # and/or a random sample of requests
+    profiling_token: str = ""
+    profiling_sample_rate: float = 0.0
+    profiling_output_dir: str = "profiles"
+    profiling_interval_ms: float = 5.0
     
     @property
     def database_url(self) -> str:
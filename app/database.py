@@ -1,19 +1,49 @@
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import get_settings
+from app.utils.request_context import check_deadline, get_request_context
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, query_cache_size=settings.database_query_cache_size)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Registered on the Engine class so every engine (including test engines)
+# reports statement timings to the current request, if there is one.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request_context = get_request_context()
+    if request_context is not None:
+        # Don't start new SQL for a request whose client has given up
+        request_context.check_deadline()
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request_context = get_request_context()
+    start_times = conn.info.get("query_start_time")
+    if request_context is not None and start_times:
+        # rowcount is -1 where the driver doesn't know it (SQLite SELECTs)
+        rows = cursor.rowcount if cursor.rowcount >= 0 else None
+        request_context.record_statement(time.perf_counter() - start_times.pop(), statement, rows)
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    request_context = get_request_context()
+    if request_context is not None:
+        # The write is durable: finish the response (e.g. the refresh after
+        # commit) rather than answer 503 and invite a duplicate retry
+        request_context.deadline = None
+
 def get_db():
+    check_deadline()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
-
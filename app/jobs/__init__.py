@@ -0,0 +1,3 @@
+from app.jobs.queue import Job, enqueue, get_queue, job, metrics
+
+__all__ = ["Job", "enqueue", "get_queue", "job", "metrics"]
@@ -0,0 +1,93 @@
+"""
+Background job command line
+
+Usage:
+    python -m app.jobs worker [--concurrency 4] [--report-interval 60]
+    python -m app.jobs enqueue stats.reconcile [--payload '{}']
+    python -m app.jobs stats
+
+All commands need JOB_QUEUE_BACKEND=database: the "memory" queue lives
+inside the API process, which runs its own worker threads, so a separate
+command could neither reach its jobs nor its metrics.
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from datetime import timedelta
+from app.config import get_settings
+from app.jobs.queue import enqueue, get_queue, metrics
+from app.jobs.worker import create_worker_pool
+
+logger = logging.getLogger("app.jobs")
+
+def require_database_backend(command: str):
+    if get_settings().job_queue_backend != "database":
+        sys.exit(f"python -m app.jobs {command} requires JOB_QUEUE_BACKEND=database")
+
+def purge_finished_jobs(queue, older_than: timedelta):
+    try:
+        purged = queue.purge(older_than)
+    except Exception:
+        logger.exception("Purging finished jobs failed")
+        return
+    if purged:
+        logger.info("Purged %s finished jobs", purged)
+
+def run_worker(args):
+    require_database_backend("worker")
+    settings = get_settings()
+    queue = get_queue()
+    pool = create_worker_pool(args.concurrency)
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+
+    pool.start()
+    next_purge = time.monotonic()
+    while True:
+        if time.monotonic() >= next_purge:
+            purge_finished_jobs(queue, timedelta(hours=settings.job_retention_hours))
+            next_purge = time.monotonic() + settings.job_purge_interval_seconds
+        if stopped.wait(args.report_interval):
+            break
+        logger.info("Job queue: %s", json.dumps(metrics.snapshot(queue.depth())))
+    logger.info("Stopping job workers")
+    pool.stop()
+
+def run_enqueue(args):
+    require_database_backend("enqueue")
+    if not enqueue(args.name, **json.loads(args.payload)):
+        sys.exit("Job was dropped: queue is full")
+
+def run_stats(args):
+    # Latency metrics live in each worker process; the table has the job counts
+    require_database_backend("stats")
+    print(json.dumps(get_queue().status_counts(), indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.jobs", description="Background job tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="Run a pool of job workers")
+    worker.add_argument("--concurrency", type=int, default=None)
+    worker.add_argument("--report-interval", type=float, default=60.0, help="Seconds between metric log lines")
+    worker.set_defaults(func=run_worker)
+
+    enqueue_parser = commands.add_parser("enqueue", help="Queue a job by name")
+    enqueue_parser.add_argument("name")
+    enqueue_parser.add_argument("--payload", default="{}", help="JSON object of handler arguments")
+    enqueue_parser.set_defaults(func=run_enqueue)
+
+    stats = commands.add_parser("stats", help="Print job counts by status")
+    stats.set_defaults(func=run_stats)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
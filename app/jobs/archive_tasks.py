@@ -0,0 +1,63 @@
+"""
+Move old completed tasks from tasks to tasks_archive
+
+Keeps the hot tasks table (and its indexes) limited to open and recently
+completed tasks. Archived tasks stay readable with include_archived=true.
+
+Usage:
+    python -m app.jobs.archive_tasks                        # run once
+    python -m app.jobs.archive_tasks --older-than-days 30 --interval 3600
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services import archive_service
+
+logger = logging.getLogger(__name__)
+
+def run_once(
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    session_factory=SessionLocal
+) -> int:
+    settings = get_settings()
+    db = session_factory()
+    try:
+        moved = archive_service.archive_completed_tasks(
+            db,
+            older_than_days if older_than_days is not None else settings.archive_after_days,
+            batch_size or settings.archive_batch_size
+        )
+        logger.info("Archived %s completed tasks", moved)
+        return moved
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Archive old completed tasks")
+    parser.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    parser.add_argument("--interval", type=int, default=0, help="Seconds between runs (0 = run once)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        try:
+            run_once(args.older_than_days, args.batch_size)
+        except Exception:
+            logger.exception("Task archival failed")
+            if not args.interval:
+                raise
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
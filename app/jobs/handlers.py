@@ -0,0 +1,23 @@
+"""Job handlers; each is called with a fresh session plus the job payload"""
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.jobs.queue import job
+from app.services import api_key_service, archive_service, stats_service
+
+@job("api_keys.touch_last_used")
+def touch_last_used(db: Session, api_key_id: int, used_at: str):
+    api_key_service.set_last_used(db, api_key_id, datetime.fromisoformat(used_at))
+
+@job("stats.reconcile")
+def reconcile_stats(db: Session):
+    stats_service.reconcile(db)
+
+@job("tasks.archive_completed")
+def archive_completed_tasks(db: Session, older_than_days: int = None, batch_size: int = None):
+    settings = get_settings()
+    archive_service.archive_completed_tasks(
+        db,
+        older_than_days if older_than_days is not None else settings.archive_after_days,
+        batch_size or settings.archive_batch_size
+    )
@@ -0,0 +1,63 @@
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+class QueueMetrics:
+    """
+    Thread-safe counters and latency samples for the job queue
+
+    ``wait`` is the time a job spent queued before a worker picked it up,
+    ``run`` is the time the handler took. Only the last ``window`` samples
+    are kept for percentiles.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.dropped = 0
+        self._wait: Deque[float] = deque(maxlen=window)
+        self._run: Deque[float] = deque(maxlen=window)
+
+    def incr(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def observe(self, wait_seconds: float, run_seconds: float):
+        with self._lock:
+            self._wait.append(wait_seconds)
+            self._run.append(run_seconds)
+
+    def snapshot(self, depth: int) -> Dict:
+        with self._lock:
+            wait = sorted(self._wait)
+            run = sorted(self._run)
+            counters = {
+                "enqueued": self.enqueued,
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+        return {
+            "depth": depth,
+            **counters,
+            "wait_ms": {
+                "p50": round(_percentile(wait, 0.50) * 1000, 3),
+                "p95": round(_percentile(wait, 0.95) * 1000, 3),
+                "max": round((wait[-1] if wait else 0.0) * 1000, 3),
+            },
+            "run_ms": {
+                "p50": round(_percentile(run, 0.50) * 1000, 3),
+                "p95": round(_percentile(run, 0.95) * 1000, 3),
+                "max": round((run[-1] if run else 0.0) * 1000, 3),
+            },
+        }
@@ -0,0 +1,276 @@
+import heapq
+import importlib
+import itertools
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+from sqlalchemy import and_, func, or_
+from app.config import get_settings
+from app.database import SessionLocal
+from app.jobs.metrics import QueueMetrics
+from app.models.background_job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+HANDLERS: Dict[str, Callable] = {}
+
+def job(name: str):
+    """
+    Register a job handler under ``name``
+
+    Handlers are called as ``handler(db, **payload)`` with a fresh session
+    which is committed when the handler returns.
+    """
+    def decorator(handler: Callable) -> Callable:
+        HANDLERS[name] = handler
+        return handler
+    return decorator
+
+def get_handler(name: str) -> Optional[Callable]:
+    # Handlers import the services, which import this module: load them lazily
+    importlib.import_module("app.jobs.handlers")
+    return HANDLERS.get(name)
+
+@dataclass
+class Job:
+    name: str
+    payload: Dict
+    id: Optional[int] = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    run_at: float = field(default_factory=time.time)
+
+class QueueFull(Exception):
+    pass
+
+class MemoryQueue:
+    """In-process queue; jobs are lost if the process exits"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def put(self, job: Job):
+        with self._condition:
+            if self.maxsize and len(self._heap) >= self.maxsize:
+                raise QueueFull(f"Job queue is full ({self.maxsize} jobs)")
+            heapq.heappush(self._heap, (job.run_at, next(self._sequence), job))
+            self._condition.notify()
+
+    def get(self, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._heap and self._heap[0][0] <= time.time():
+                    return heapq.heappop(self._heap)[2]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if self._heap:
+                    remaining = min(remaining, max(0.0, self._heap[0][0] - time.time()))
+                self._condition.wait(remaining)
+
+    def ack(self, job: Job):
+        pass
+
+    def retry(self, job: Job, delay: float, error: str):
+        job.run_at = time.time() + delay
+        self.put(job)
+
+    def fail(self, job: Job, error: str):
+        logger.error("Job %s failed permanently after %s attempts: %s", job.name, job.attempts, error)
+
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+class DatabaseQueue:
+    """
+    Durable queue stored in the background_jobs table
+
+    Workers in any process claim jobs with SELECT ... FOR UPDATE SKIP LOCKED,
+    so several worker processes can share the table without double-running.
+    A claim is a lease of `lease_seconds`: a job still "running" after that
+    (its worker died mid-job) is claimed again, and the lost run counts as
+    an attempt. Jobs must therefore finish well within the lease.
+    """
+
+    def __init__(self, session_factory=SessionLocal, poll_interval: float = 1.0, lease_seconds: float = 600.0):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+
+    def put(self, job: Job):
+        db = self.session_factory()
+        try:
+            row = BackgroundJob(
+                name=job.name,
+                payload=json.dumps(job.payload),
+                status="queued",
+                attempts=job.attempts,
+                run_at=datetime.fromtimestamp(job.run_at),
+                enqueued_at=datetime.fromtimestamp(job.enqueued_at)
+            )
+            db.add(row)
+            db.commit()
+            job.id = row.id
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[Job]:
+        db = self.session_factory()
+        try:
+            now = datetime.now()
+            row = (
+                db.query(BackgroundJob)
+                .filter(or_(
+                    and_(BackgroundJob.status == "queued", BackgroundJob.run_at <= now),
+                    and_(
+                        BackgroundJob.status == "running",
+                        BackgroundJob.claimed_at < now - timedelta(seconds=self.lease_seconds)
+                    )
+                ))
+                .order_by(BackgroundJob.run_at)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if row is None:
+                db.rollback()
+                return None
+            if row.status == "running":
+                logger.warning("Job %s (id %s) lease expired; running it again", row.name, row.id)
+                row.attempts += 1
+            row.status = "running"
+            row.claimed_at = now
+            db.commit()
+            return Job(
+                id=row.id,
+                name=row.name,
+                payload=json.loads(row.payload),
+                attempts=row.attempts,
+                enqueued_at=row.enqueued_at.timestamp(),
+                run_at=row.run_at.timestamp()
+            )
+        finally:
+            db.close()
+
+    def get(self, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        while True:
+            claimed = self._claim()
+            if claimed is not None:
+                return claimed
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _finish(self, job: Job, **values):
+        db = self.session_factory()
+        try:
+            db.query(BackgroundJob).filter(BackgroundJob.id == job.id).update(values)
+            db.commit()
+        finally:
+            db.close()
+
+    def ack(self, job: Job):
+        self._finish(job, status="done", attempts=job.attempts, finished_at=datetime.now())
+
+    def retry(self, job: Job, delay: float, error: str):
+        self._finish(
+            job,
+            status="queued",
+            attempts=job.attempts,
+            run_at=datetime.now() + timedelta(seconds=delay),
+            last_error=error
+        )
+
+    def fail(self, job: Job, error: str):
+        self._finish(job, status="failed", attempts=job.attempts, finished_at=datetime.now(), last_error=error)
+
+    def depth(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(func.count(BackgroundJob.id)).filter(BackgroundJob.status == "queued").scalar()
+        finally:
+            db.close()
+
+    def status_counts(self) -> Dict[str, int]:
+        db = self.session_factory()
+        try:
+            counts = db.query(BackgroundJob.status, func.count(BackgroundJob.id)).group_by(BackgroundJob.status)
+            return {**{status: 0 for status in ("queued", "running", "done", "failed")}, **dict(counts.all())}
+        finally:
+            db.close()
+
+    def purge(self, older_than: timedelta, batch_size: int = 1000) -> int:
+        """Delete done and failed jobs finished more than `older_than` ago; returns how many"""
+        cutoff = datetime.now() - older_than
+        deleted = 0
+        db = self.session_factory()
+        try:
+            while True:
+                ids = [
+                    job_id for job_id, in db.query(BackgroundJob.id)
+                    .filter(BackgroundJob.status.in_(("done", "failed")), BackgroundJob.finished_at < cutoff)
+                    .limit(batch_size)
+                ]
+                if not ids:
+                    return deleted
+                db.query(BackgroundJob).filter(BackgroundJob.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                deleted += len(ids)
+        finally:
+            db.close()
+
+class InlineQueue:
+    """Runs each job immediately in the caller's thread (development/tests)"""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def put(self, job: Job):
+        from app.jobs.worker import execute_job
+        error = execute_job(job, self.session_factory, metrics)
+        metrics.incr("failed" if error else "succeeded")
+
+    def depth(self) -> int:
+        return 0
+
+metrics = QueueMetrics()
+
+@lru_cache()
+def get_queue():
+    settings = get_settings()
+    backend = settings.job_queue_backend
+    if backend == "memory":
+        return MemoryQueue(maxsize=settings.job_memory_queue_size)
+    if backend == "database":
+        return DatabaseQueue(poll_interval=settings.job_poll_interval_seconds, lease_seconds=settings.job_lease_seconds)
+    if backend == "inline":
+        return InlineQueue()
+    raise ValueError(f"Unknown job queue backend: {backend}")
+
+def enqueue(name: str, delay: float = 0.0, **payload) -> bool:
+    """
+    Queue ``name`` to run later with ``payload`` (must be JSON-serializable)
+
+    Returns False if the job was dropped because the queue is full; callers
+    only enqueue deferrable work, so dropping is preferred over blocking.
+    """
+    now = time.time()
+    try:
+        get_queue().put(Job(name=name, payload=payload, enqueued_at=now, run_at=now + delay))
+    except QueueFull:
+        metrics.incr("dropped")
+        logger.warning("Dropped job %s: queue full", name)
+        return False
+    metrics.incr("enqueued")
+    return True
@@ -0,0 +1,52 @@
+"""
+Periodically rebuild task counters and histograms from the tasks table
+
+Counters are maintained incrementally by every write; this job corrects
+any drift (e.g. rows changed outside the API).
+
+Usage:
+    python -m app.jobs.reconcile_stats             # run once
+    python -m app.jobs.reconcile_stats --interval 3600
+"""
+import argparse
+import logging
+import time
+from app.database import SessionLocal
+from app.services import stats_service
+
+logger = logging.getLogger(__name__)
+
+def run_once(session_factory=SessionLocal):
+    db = session_factory()
+    try:
+        counters = stats_service.reconcile(db)
+        logger.info(
+            "Reconciled task stats for %s owners: total=%s",
+            len(counters), sum(row.total for row in counters.values())
+        )
+        return counters
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile task statistics")
+    parser.add_argument("--interval", type=int, default=0, help="Seconds between runs (0 = run once)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        try:
+            run_once()
+        except Exception:
+            logger.exception("Task stats reconcile failed")
+            if not args.interval:
+                raise
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
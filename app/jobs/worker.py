@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from typing import List, Optional
+from app.config import get_settings
+from app.database import SessionLocal
+from app.jobs.metrics import QueueMetrics
+from app.jobs.queue import Job, QueueFull, get_handler, get_queue, metrics
+
+logger = logging.getLogger(__name__)
+
+def execute_job(job: Job, session_factory, metrics: QueueMetrics) -> Optional[str]:
+    """
+    Run a single job in its own session
+
+    Returns None on success, or the error message if the handler raised or
+    no handler is registered for the job.
+    """
+    handler = get_handler(job.name)
+    started = time.time()
+    job.attempts += 1
+    if handler is None:
+        return f"No handler registered for job {job.name!r}"
+
+    db = session_factory()
+    try:
+        handler(db, **job.payload)
+        db.commit()
+        return None
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s (attempt %s) raised", job.name, job.attempts)
+        return f"{type(e).__name__}: {e}"
+    finally:
+        db.close()
+        metrics.observe(max(0.0, started - job.enqueued_at), time.time() - started)
+
+class WorkerPool:
+    """
+    Pool of threads pulling jobs from a queue
+
+    Failed jobs are retried with exponential backoff
+    (``retry_backoff * 2 ** (attempt - 1)`` seconds) until ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        queue,
+        metrics: QueueMetrics,
+        session_factory=SessionLocal,
+        concurrency: int = 2,
+        max_attempts: int = 3,
+        retry_backoff: float = 1.0,
+        poll_interval: float = 1.0
+    ):
+        self.queue = queue
+        self.metrics = metrics
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %s job workers", self.concurrency)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_pending(self) -> int:
+        """Process jobs that are due now in the calling thread; returns how many ran"""
+        processed = 0
+        while True:
+            job = self.queue.get(timeout=0)
+            if job is None:
+                return processed
+            self._process(job)
+            processed += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.get(timeout=self.poll_interval)
+                if job is not None:
+                    self._process(job)
+            except Exception:
+                # Keep the thread alive; a lost database job is re-run once its lease expires
+                logger.exception("Job worker error")
+                self._stop.wait(self.poll_interval)
+
+    def _process(self, job: Job):
+        error = execute_job(job, self.session_factory, self.metrics)
+        if error is None:
+            self.queue.ack(job)
+            self.metrics.incr("succeeded")
+        elif job.attempts < self.max_attempts and get_handler(job.name) is not None:
+            try:
+                self.queue.retry(job, self.retry_backoff * 2 ** (job.attempts - 1), error)
+            except QueueFull:
+                self.queue.fail(job, f"{error} (retry dropped: queue full)")
+                self.metrics.incr("dropped")
+                return
+            self.metrics.incr("retried")
+        else:
+            self.queue.fail(job, error)
+            self.metrics.incr("failed")
+
+def create_worker_pool(concurrency: Optional[int] = None) -> WorkerPool:
+    """Build a WorkerPool for the configured queue backend"""
+    settings = get_settings()
+    return WorkerPool(
+        get_queue(),
+        metrics,
+        concurrency=concurrency or settings.job_workers,
+        max_attempts=settings.job_max_attempts,
+        retry_backoff=settings.job_retry_backoff_seconds,
+        poll_interval=settings.job_poll_interval_seconds
+    )
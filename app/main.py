@@ -1,6 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.config import get_settings
+from app.jobs.worker import create_worker_pool
+from app.middleware import CompressionMiddleware, ConcurrencyLimitMiddleware, ProfilingMiddleware
 from app.routes.task_routes import router as task_router
 from app.routes.api_key_routes import router as api_key_router
+from app.routes.job_routes import router as job_router
+from app.routes.batch_routes import router as batch_router
+from app.utils.request_context import DeadlineExceeded
+
+settings = get_settings()
 
 app = FastAPI(
     title="Task Management API",
@@ -8,10 +17,64 @@ app = FastAPI(
     version="2.0.0"
 )
 
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+
+# Not installed at all unless enabled, so unprofiled requests pay nothing
+if settings.profiling_token or settings.profiling_sample_rate > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=settings.profiling_token,
+        sample_rate=settings.profiling_sample_rate,
+        output_dir=settings.profiling_output_dir,
+        interval=settings.profiling_interval_ms / 1000
+    )
+
+# Added last so it is outermost: shed requests never reach the app
+if settings.concurrency_limit_enabled:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        read_limit=settings.concurrency_read_limit,
+        write_limit=settings.concurrency_write_limit,
+        admin_limit=settings.concurrency_admin_limit,
+        min_limit=settings.concurrency_min_limit,
+        max_queue=settings.concurrency_max_queue,
+        target_db_latency=settings.concurrency_target_db_latency_ms / 1000,
+        request_timeout=settings.request_timeout_seconds,
+        retry_after=settings.load_shed_retry_after_seconds
+    )
+
+@app.exception_handler(DeadlineExceeded)
+def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Request deadline exceeded"},
+        headers={"Retry-After": str(settings.load_shed_retry_after_seconds)}
+    )
+
 app.include_router(api_key_router)
 app.include_router(task_router)
+app.include_router(batch_router)
+app.include_router(job_router)
+
+# The in-memory queue lives in this process, so its workers do too
+worker_pool = create_worker_pool() if settings.job_queue_backend == "memory" else None
+
+@app.on_event("startup")
+def start_job_workers():
+    if worker_pool:
+        worker_pool.start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    if worker_pool:
+        worker_pool.stop(timeout=5)
 
 @app.get("/")
 def root():
     return {"message": "Task Management API is running"}
-
@@ -0,0 +1,5 @@
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.concurrency import AIMDLimiter, ConcurrencyLimitMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+
+__all__ = ["CompressionMiddleware", "AIMDLimiter", "ConcurrencyLimitMiddleware", "ProfilingMiddleware"]
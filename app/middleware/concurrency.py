@@ -0,0 +1,213 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict, Optional
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.utils.request_context import (
+    RequestContext, get_request_context, reset_request_context, set_request_context
+)
+
+TIMEOUT_HEADER = "x-request-timeout-ms"
+
+# Paths that are never limited: health check and API docs
+EXEMPT_PATHS = ("/", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json")
+
+# Path prefixes served by the admin limiter (API key management, job metrics)
+ADMIN_PREFIXES = ("/api-keys", "/jobs")
+
+class AIMDLimiter:
+    """
+    Concurrency limit adjusted by additive increase / multiplicative decrease
+
+    Each request that finishes with DB latency at or under the target raises
+    the limit by 1/limit (about +1 per limit's worth of requests); one that
+    is slower, or that ran out of time, cuts it by `backoff_ratio`. The cut
+    is applied once per latency window: requests that got their slot before
+    the last cut saw the same congestion and don't cut again. Requests over
+    the limit wait in a FIFO queue of at most `max_queue` entries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        max_queue: int = 50,
+        target_latency: float = 0.05,
+        backoff_ratio: float = 0.9
+    ):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial_limit or max_limit)
+        self.max_queue = max_queue
+        self.target_latency = target_latency
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+        self.rejected = 0
+        self._last_decrease = float("-inf")
+        self._waiters = deque()
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a slot, waiting up to `timeout` seconds; False if shed"""
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue or (timeout is not None and timeout <= 0):
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Granted a slot just as the wait timed out; give it back
+                self.release()
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False, started_at: Optional[float] = None):
+        """
+        Free a slot; `latency` (seconds) or `overloaded` adjusts the limit
+
+        `started_at` is the time.monotonic() at which the slot was acquired.
+        """
+        self.in_flight -= 1
+        if overloaded or (latency is not None and latency > self.target_latency):
+            if started_at is None or started_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = time.monotonic()
+        elif latency is not None:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot is handed over directly so newcomers can't take it
+                self.in_flight += 1
+                waiter.set_result(True)
+
+    def snapshot(self) -> Dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "rejected": self.rejected
+        }
+
+class ConcurrencyLimitMiddleware:
+    """
+    Cap in-flight requests per route class and shed load past capacity
+
+    Requests are classed as "admin" (API key management and job endpoints),
+    "reads" (GET/HEAD) or "writes". Each class has its own AIMDLimiter driven
+    by the average time the request's SQL statements took. A request that
+    cannot get a slot before its deadline (X-Request-Timeout-Ms, capped by
+    `request_timeout`) or finds the wait queue full gets a 503 with
+    Retry-After. The deadline is published through the request context so
+    dependencies and SQL execution stop once it has passed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        read_limit: int = 40,
+        write_limit: int = 20,
+        admin_limit: int = 5,
+        min_limit: int = 1,
+        max_queue: int = 50,
+        target_db_latency: float = 0.05,
+        request_timeout: float = 10.0,
+        retry_after: int = 1
+    ) -> None:
+        self.app = app
+        self.limiters = {
+            name: AIMDLimiter(
+                name, max_limit=limit, min_limit=min_limit,
+                max_queue=max_queue, target_latency=target_db_latency
+            )
+            for name, limit in (("reads", read_limit), ("writes", write_limit), ("admin", admin_limit))
+        }
+        self.request_timeout = request_timeout
+        self.retry_after = retry_after
+
+    @staticmethod
+    def classify(scope: Scope) -> Optional[str]:
+        path = scope["path"]
+        if path in EXEMPT_PATHS:
+            return None
+        if any(path == prefix or path.startswith(prefix + "/") for prefix in ADMIN_PREFIXES):
+            return "admin"
+        return "reads" if scope["method"] in ("GET", "HEAD") else "writes"
+
+    def _timeout(self, headers: Headers) -> float:
+        requested = headers.get(TIMEOUT_HEADER)
+        if requested:
+            try:
+                return min(self.request_timeout, max(0.0, int(requested) / 1000))
+            except ValueError:
+                pass
+        return self.request_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = self.classify(scope)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        timeout = self._timeout(Headers(scope=scope))
+        deadline = time.monotonic() + timeout
+        if not await limiter.acquire(timeout):
+            await self._shed(send, "Server is at capacity, retry later")
+            return
+        started_at = time.monotonic()
+
+        context = get_request_context()
+        token = None
+        if context is None:
+            context = RequestContext(deadline)
+            token = set_request_context(context)
+        else:
+            context.deadline = deadline
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if token is not None:
+                reset_request_context(token)
+            latency = context.db_time / context.db_statements if context.db_statements else None
+            limiter.release(latency, overloaded=context.deadline_exceeded, started_at=started_at)
+
+    async def _shed(self, send: Send, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
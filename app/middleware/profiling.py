@@ -0,0 +1,146 @@
+import hmac
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.profiler import SamplingProfiler
+from app.utils.request_context import (
+    RequestContext, get_request_context, reset_request_context, set_request_context
+)
+
+PROFILE_HEADER = "x-profile"
+
+# Name anyio gives the threads of the pool that runs sync endpoints,
+# dependencies and response validation (checked by the test suite)
+THREADPOOL_THREAD_NAME = "AnyIO worker thread"
+
+class ProfilingMiddleware:
+    """
+    Profile individual requests on demand
+
+    A request is profiled when it carries `X-Profile: <token>` matching the
+    configured token, or is picked at random with probability `sample_rate`.
+    Profiled requests get a sampling CPU profile of the threads serving them
+    and a trace of every SQL statement (duration, row count). Both are written
+    to `output_dir` as <id>.folded (flame graph input) and <id>.json, and the
+    response carries X-Profile-Id and a Server-Timing header. Other requests
+    pass straight through.
+
+    The whole threadpool is sampled while a profiled request runs, since any
+    worker may run its endpoint, dependencies or serialization. Work done
+    for concurrent requests lands in the same profile, so the trace records
+    the most other requests seen in flight; profile an otherwise idle
+    process for a clean result.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str = "",
+        sample_rate: float = 0.0,
+        output_dir: str = "profiles",
+        interval: float = 0.005
+    ) -> None:
+        self.app = app
+        self.token = token
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.interval = interval
+        self._in_flight = 0
+        # peak requests in flight, per running profile
+        self._active_profiles = {}
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.token:
+            requested = Headers(scope=scope).get(PROFILE_HEADER)
+            if requested and hmac.compare_digest(requested.encode(), self.token.encode()):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self._in_flight += 1
+        for profile_id in self._active_profiles:
+            self._active_profiles[profile_id] = max(self._active_profiles[profile_id], self._in_flight)
+        try:
+            if self._should_profile(scope):
+                await self._profile(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile_id = uuid.uuid4().hex
+        self._active_profiles[profile_id] = self._in_flight
+        context = get_request_context()
+        token = None
+        if context is None:
+            context = RequestContext()
+            token = set_request_context(context)
+        context.statements = []
+        profiler = SamplingProfiler(self.interval, thread_name=THREADPOOL_THREAD_NAME)
+        profiler.add_thread(threading.get_ident())
+        status_code: Optional[int] = None
+        started = time.perf_counter()
+
+        async def send_with_profile_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Id"] = profile_id
+                headers.append("Server-Timing", (
+                    f'db;dur={context.db_time * 1000:.2f};desc="{context.db_statements} statements", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+                ))
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_headers)
+        finally:
+            profiler.stop()
+            duration = time.perf_counter() - started
+            peak_in_flight = self._active_profiles.pop(profile_id)
+            if token is not None:
+                reset_request_context(token)
+            trace = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query_string": scope.get("query_string", b"").decode("latin-1"),
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "db_time_ms": round(context.db_time * 1000, 3),
+                "sample_interval_ms": self.interval * 1000,
+                "samples": sum(profiler.samples.values()),
+                # Their threadpool work is sampled too; > 0 means a mixed profile
+                "other_requests_in_flight": peak_in_flight - 1,
+                "hottest": profiler.hottest(),
+                "statements": [
+                    {
+                        "statement": entry["statement"],
+                        "duration_ms": round(entry["duration"] * 1000, 3),
+                        "rows": entry["rows"]
+                    }
+                    for entry in context.statements
+                ],
+            }
+            await run_in_threadpool(self._write, profile_id, trace, list(profiler.folded()))
+
+    def _write(self, profile_id: str, trace: dict, folded: list):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, profile_id)
+        with open(base + ".folded", "w") as f:
+            f.write("\n".join(folded) + "\n")
+        with open(base + ".json", "w") as f:
+            json.dump(trace, f, indent=2, default=str)
@@ -1,5 +1,7 @@
-from app.models.task import Task
+from app.models.task import Task, TaskArchive
 from app.models.api_key import APIKey
+from app.models.task_stats import TaskCounters, TaskDailyStats
+from app.models.background_job import BackgroundJob
 
-__all__ = ["Task", "APIKey"]
+__all__ = ["Task", "TaskArchive", "APIKey", "TaskCounters", "TaskDailyStats", "BackgroundJob"]
 
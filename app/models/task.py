@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import (
+    Column, Computed, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, UniqueConstraint
+)
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -6,9 +8,39 @@ class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(200), unique=True, nullable=False, index=True)
+    owner_key_id = Column(Integer, ForeignKey("api_keys.id"), nullable=True)
+    title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
     completed = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    # owner_key_id with unowned tasks as 0, so the unique title constraint
+    # also covers them (a NULL owner would make every title distinct)
+    owner_scope = Column(Integer, Computed("COALESCE(owner_key_id, 0)", persisted=True), nullable=False)
 
+    # Every query is scoped to one owner, so indexes lead with owner_key_id
+    __table_args__ = (
+        UniqueConstraint("owner_scope", "title", name="uq_tasks_owner_scope_title"),
+        Index("ix_tasks_owner_created", "owner_key_id", "created_at", "id"),
+        Index("ix_tasks_owner_completed_created", "owner_key_id", "completed", "created_at", "id"),
+        Index("ix_tasks_completed_at", "completed_at"),
+    )
+
+class TaskArchive(Base):
+    """Completed tasks moved out of the hot tasks table by the archive job"""
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    owner_key_id = Column(Integer, ForeignKey("api_keys.id"), nullable=True)
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    completed = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_tasks_archive_owner_created", "owner_key_id", "created_at", "id"),
+    )
@@ -0,0 +1,33 @@
+import time
+from sqlalchemy import BigInteger, Column, Integer, Date, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+# Stats rows for tasks without an owner are stored under this key
+UNOWNED_KEY_ID = 0
+
+def _initial_version() -> int:
+    # Time-based so a recreated row never repeats an earlier row's versions
+    return time.time_ns()
+
+class TaskCounters(Base):
+    """Running task totals per owner, kept current by task_service writes"""
+    __tablename__ = "task_counters"
+
+    owner_key_id = Column(Integer, primary_key=True, autoincrement=False)
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    # Tasks moved to tasks_archive; still included in total and completed
+    archived = Column(Integer, nullable=False, default=0)
+    # Incremented by every write to the owner's tasks, in the same transaction
+    version = Column(BigInteger, nullable=False, default=_initial_version, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TaskDailyStats(Base):
+    """Number of tasks created and completed per owner and calendar day"""
+    __tablename__ = "task_daily_stats"
+
+    owner_key_id = Column(Integer, primary_key=True, autoincrement=False)
+    day = Column(Date, primary_key=True)
+    created = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
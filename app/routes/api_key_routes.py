@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
+from app.config import get_settings
 from app.database import get_db
 from app.schemas.api_key import APIKeyCreate, APIKeyResponse
 from app.services import api_key_service
+from app.utils.http_cache import cache_control
 
-router = APIRouter(prefix="/api-keys", tags=["api-keys"])
+settings = get_settings()
+
+router = APIRouter(
+    prefix="/api-keys",
+    tags=["api-keys"],
+    dependencies=[Depends(cache_control(settings.cache_control_api_keys))]
+)
 
 @router.post("/generate", response_model=APIKeyResponse, status_code=201)
 def generate_api_key(
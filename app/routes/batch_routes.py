@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.database import get_db
+from app.schemas.batch import BatchRequest, BatchResponse
+from app.services import batch_service
+from app.utils.security import verify_api_key
+from app.utils.http_cache import cache_control
+
+settings = get_settings()
+
+router = APIRouter(tags=["batch"])
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    dependencies=[Depends(cache_control(settings.cache_control_writes))]
+)
+def run_batch(
+    batch: BatchRequest,
+    db: Session = Depends(get_db),
+    api_key = Depends(verify_api_key)
+):
+    """
+    Run several task operations with one authentication check and one transaction
+
+    Each operation is `{"op": "create" | "get" | "update" | "delete", "id": ..., "data": {...}}`.
+    Results are returned in order with their own HTTP-style `status` and `body`;
+    a failed operation does not affect the others.
+    """
+    return BatchResponse(results=batch_service.run_batch(db, batch.operations, owner_id=api_key.id))
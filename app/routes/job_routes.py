@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+from app.jobs import get_queue, metrics
+from app.utils.security import verify_api_key
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/metrics")
+def read_job_metrics(api_key = Depends(verify_api_key)):
+    """Queue depth, job outcome counters and wait/run latency percentiles"""
+    return metrics.snapshot(get_queue().depth())
@@ -1,30 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.config import get_settings
 from app.database import get_db
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
-from app.schemas.pagination import PaginationParams, PaginatedResponse
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskResponse, parse_task_fields, parse_task_ids, task_fields_model
+)
+from app.schemas.pagination import PaginationParams, PaginationMeta, PaginatedResponse
+from app.schemas.stats import TaskStatsResponse
 from app.services import task_service
 from app.utils.security import verify_api_key
+from app.utils.http_cache import cache_control
+from app.utils.response_utils import RawJSONResponse
+
+settings = get_settings()
+read_cache = Depends(cache_control(settings.cache_control_task_reads))
+write_cache = Depends(cache_control(settings.cache_control_writes))
 
 router = APIRouter(prefix="/items", tags=["tasks"])
 
-@router.post("/", response_model=TaskResponse, status_code=201)
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. id,title,completed (id is always included)"
+
+def get_requested_fields(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    try:
+        return parse_task_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def get_requested_ids(
+    ids: Optional[str] = Query(None, description="Comma-separated task ids to fetch in one query (max 100)")
+):
+    try:
+        return parse_task_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def partial_response(content, response: Response):
+    """Serialize a sparse fieldset response, keeping headers set by dependencies"""
+    return RawJSONResponse(content.model_dump_json(), headers=dict(response.headers))
+
+def _serves_first_page(page: int, page_size: int, fields, include_archived: bool) -> bool:
+    """Whether a listing is answered from the pre-serialized first-page snapshot"""
+    return (
+        settings.first_page_snapshot_enabled
+        and page == 1
+        and page_size <= settings.first_page_snapshot_size
+        and not fields
+        and not include_archived
+    )
+
+@router.post("/", response_model=TaskResponse, status_code=201, dependencies=[write_cache])
 def create_task(
     task: TaskCreate,
     db: Session = Depends(get_db),
     api_key = Depends(verify_api_key)
 ):
     try:
-        return task_service.create_task(db, task)
-    except Exception as e:
+        return task_service.create_task(db, task, owner_id=api_key.id)
+    except IntegrityError:
         raise HTTPException(status_code=400, detail=f"Task with this title already exists")
 
-@router.get("/", response_model=PaginatedResponse[TaskResponse])
+@router.get("/", response_model=PaginatedResponse[TaskResponse], dependencies=[read_cache])
 def read_tasks(
+    response: Response,
     page: int = Query(1, ge=1, description="Page number (starts from 1)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     completed: Optional[bool] = Query(None, description="Filter by completed status"),
+    fields: Optional[tuple] = Depends(get_requested_fields),
+    ids: Optional[tuple] = Depends(get_requested_ids),
+    include_archived: bool = Query(False, description="Also return archived (old completed) tasks"),
     db: Session = Depends(get_db),
     api_key = Depends(verify_api_key)
 ):
@@ -34,44 +81,90 @@ def read_tasks(
     - **page**: Page number (starts from 1)
     - **page_size**: Number of items per page (1-100)
     - **completed**: Optional filter by completion status
+    - **fields**: Optional comma-separated list of fields to return
+    - **ids**: Optional comma-separated task ids; returns just those tasks
+      (in the given order, missing ids skipped) and ignores page/page_size
+    - **include_archived**: Also include tasks moved to the archive
     
     Returns paginated response with items and pagination metadata
     """
-    items, pagination_meta = task_service.get_tasks_paginated(
-        db, page=page, page_size=page_size, completed=completed
-    )
+    if ids:
+        items = task_service.get_tasks_by_ids(
+            db, ids, owner_id=api_key.id, completed=completed, fields=fields,
+            include_archived=include_archived
+        )
+        pagination_meta = PaginationMeta(
+            page=1,
+            page_size=len(ids),
+            total_items=len(items),
+            total_pages=1 if items else 0,
+            has_next=False,
+            has_previous=False
+        )
+    elif _serves_first_page(page, page_size, fields, include_archived):
+        body = task_service.get_first_page(db, api_key.id, completed=completed, page_size=page_size)
+        return RawJSONResponse(body, headers=dict(response.headers))
+    else:
+        items, pagination_meta = task_service.get_tasks_paginated(
+            db, page=page, page_size=page_size, completed=completed, fields=fields,
+            owner_id=api_key.id, include_archived=include_archived
+        )
+    if fields:
+        content_model = PaginatedResponse[task_fields_model(fields)]
+        return partial_response(content_model(items=items, pagination=pagination_meta), response)
     return PaginatedResponse(items=items, pagination=pagination_meta)
 
-@router.get("/{id}", response_model=TaskResponse)
+@router.get("/stats", response_model=TaskStatsResponse, dependencies=[read_cache])
+def read_task_stats(
+    days: int = Query(30, ge=1, le=366, description="Number of days of history to return"),
+    db: Session = Depends(get_db),
+    api_key = Depends(verify_api_key)
+):
+    """
+    Get task totals and per-day created/completed counts
+
+    Served from counters maintained on every write, so the cost does not
+    grow with the number of tasks.
+    """
+    return task_service.get_stats(db, owner_id=api_key.id, days=days)
+
+@router.get("/{id}", response_model=TaskResponse, dependencies=[read_cache])
 def read_task(
     id: int,
+    response: Response,
+    fields: Optional[tuple] = Depends(get_requested_fields),
+    include_archived: bool = Query(False, description="Also look in archived tasks"),
     db: Session = Depends(get_db),
     api_key = Depends(verify_api_key)
 ):
-    db_task = task_service.get_task(db, id)
+    db_task = task_service.get_task(
+        db, id, owner_id=api_key.id, fields=fields, include_archived=include_archived
+    )
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
+    if fields:
+        return partial_response(task_fields_model(fields).model_validate(db_task), response)
     return db_task
 
-@router.put("/{id}", response_model=TaskResponse)
+@router.put("/{id}", response_model=TaskResponse, dependencies=[write_cache])
 def update_task(
     id: int,
     task: TaskUpdate,
     db: Session = Depends(get_db),
     api_key = Depends(verify_api_key)
 ):
-    db_task = task_service.update_task(db, id, task)
+    db_task = task_service.update_task(db, id, task, owner_id=api_key.id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
-@router.delete("/{id}", status_code=204)
+@router.delete("/{id}", status_code=204, dependencies=[write_cache])
 def delete_task(
     id: int,
     db: Session = Depends(get_db),
     api_key = Depends(verify_api_key)
 ):
-    if not task_service.delete_task(db, id):
+    if not task_service.delete_task(db, id, owner_id=api_key.id):
         raise HTTPException(status_code=404, detail="Task not found")
     return None
 
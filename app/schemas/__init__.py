@@ -1,10 +1,19 @@
-from app.schemas.task import TaskBase, TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.task import (
+    TaskBase, TaskCreate, TaskUpdate, TaskResponse,
+    TASK_FIELDS, parse_task_fields, task_fields_model, MAX_TASK_IDS, parse_task_ids
+)
+from app.schemas.batch import BatchOperation, BatchRequest, BatchResult, BatchResponse
 from app.schemas.api_key import APIKeyCreate, APIKeyResponse
-from app.schemas.pagination import PaginationParams, PaginationMeta, PaginatedResponse, paginate_query
+from app.schemas.stats import DailyTaskStats, TaskStatsResponse
+from app.schemas.pagination import PaginationParams, PaginationMeta, PaginatedResponse, paginate_query, count_query, build_pagination_meta
 
 __all__ = [
     "TaskBase", "TaskCreate", "TaskUpdate", "TaskResponse",
+    "TASK_FIELDS", "parse_task_fields", "task_fields_model", "MAX_TASK_IDS", "parse_task_ids",
+    "BatchOperation", "BatchRequest", "BatchResult", "BatchResponse",
     "APIKeyCreate", "APIKeyResponse",
-    "PaginationParams", "PaginationMeta", "PaginatedResponse", "paginate_query"
+    "DailyTaskStats", "TaskStatsResponse",
+    "PaginationParams", "PaginationMeta", "PaginatedResponse", "paginate_query", "count_query",
+    "build_pagination_meta"
 ]
 
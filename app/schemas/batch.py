@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "get", "update", "delete"]
+    id: Optional[int] = Field(None, description="Task id (get, update, delete)")
+    data: Optional[Dict[str, Any]] = Field(None, description="Task fields (create, update)")
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=100)
+
+class BatchResult(BaseModel):
+    status: int
+    body: Optional[Any] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchResult]
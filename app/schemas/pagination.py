@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Generic, TypeVar, List, Optional
 from math import ceil
+from sqlalchemy import func, inspect
 
 T = TypeVar('T')
 
@@ -20,6 +21,30 @@ class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
     pagination: PaginationMeta
 
+def build_pagination_meta(total_items: int, page: int, page_size: int) -> PaginationMeta:
+    """Pagination metadata for a page of a result with `total_items` rows"""
+    total_pages = ceil(total_items / page_size) if total_items > 0 else 0
+    return PaginationMeta(
+        page=page,
+        page_size=page_size,
+        total_items=total_items,
+        total_pages=total_pages,
+        has_next=page < total_pages,
+        has_previous=page > 1
+    )
+
+def count_query(query) -> int:
+    """
+    Count the rows matched by a SQLAlchemy query
+
+    Unlike ``query.count()`` this emits a plain ``SELECT count(*) ... WHERE``
+    without wrapping every entity column (including wide Text columns) in a
+    subquery, and drops the ORDER BY which does not affect the count.
+    """
+    entity = query.column_descriptions[0]["entity"]
+    primary_key = inspect(entity).primary_key[0]
+    return query.order_by(None).with_entities(func.count(primary_key)).scalar()
+
 def paginate_query(query, page: int, page_size: int):
     """
     Paginate a SQLAlchemy query
@@ -33,20 +58,10 @@ def paginate_query(query, page: int, page_size: int):
         items: List of paginated items
         pagination_meta: Pagination metadata
     """
-    total_items = query.count()
-    total_pages = ceil(total_items / page_size) if total_items > 0 else 0
+    total_items = count_query(query)
     
     offset = (page - 1) * page_size
     items = query.offset(offset).limit(page_size).all()
     
-    pagination_meta = PaginationMeta(
-        page=page,
-        page_size=page_size,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_previous=page > 1
-    )
-    
-    return items, pagination_meta
+    return items, build_pagination_meta(total_items, page, page_size)
 
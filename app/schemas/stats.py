@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List
+
+class DailyTaskStats(BaseModel):
+    day: date
+    created: int
+    completed: int
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    completed: int
+    pending: int
+    daily: List[DailyTaskStats]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, create_model
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple, Type
 
 class TaskBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
@@ -23,3 +24,57 @@ class TaskResponse(TaskBase):
     class Config:
         from_attributes = True
 
+TASK_FIELDS = ("id", "title", "description", "completed", "created_at", "updated_at")
+
+def parse_task_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated ``fields`` parameter into a tuple of Task fields
+
+    ``id`` is always included. Returns None when no fields were requested.
+    Raises ValueError for unknown field names.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(TASK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in TASK_FIELDS if name in requested)
+
+MAX_TASK_IDS = 100
+
+def parse_task_ids(ids: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """
+    Parse a comma-separated ``ids`` parameter into unique task ids, in order
+
+    Returns None when no ids were given. Raises ValueError for non-integer
+    ids or more than MAX_TASK_IDS ids.
+    """
+    if not ids:
+        return None
+    parsed = []
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            raise ValueError(f"Invalid task id: {part}")
+        parsed.append(int(part))
+    unique = tuple(dict.fromkeys(parsed))
+    if len(unique) > MAX_TASK_IDS:
+        raise ValueError(f"At most {MAX_TASK_IDS} ids can be requested at once")
+    return unique
+
+@lru_cache(maxsize=64)
+def task_fields_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Build (and cache) a TaskResponse variant containing only the given fields"""
+    definitions = {
+        name: (TaskResponse.model_fields[name].annotation, TaskResponse.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        "TaskPartialResponse",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
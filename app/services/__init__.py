@@ -2,23 +2,33 @@ from app.services.task_service import (
     create_task,
     get_task,
     get_tasks,
+    get_tasks_by_ids,
     get_tasks_paginated,
+    get_first_page,
     update_task,
     delete_task,
     get_completed_count,
+    get_stats,
     create_task_with_transaction
 )
 from app.services import api_key_service
+from app.services import stats_service
+from app.services import archive_service
 
 __all__ = [
     "create_task",
     "get_task",
     "get_tasks",
+    "get_tasks_by_ids",
     "get_tasks_paginated",
+    "get_first_page",
     "update_task",
     "delete_task",
     "get_completed_count",
+    "get_stats",
     "create_task_with_transaction",
-    "api_key_service"
+    "api_key_service",
+    "stats_service",
+    "archive_service"
 ]
 
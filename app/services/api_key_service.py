@@ -1,8 +1,20 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, or_, select
 from app.models.api_key import APIKey
 from app.schemas.api_key import APIKeyCreate
+from app.config import get_settings
+from app.jobs import enqueue
 import secrets
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+settings = get_settings()
+
+# Monotonic time a last_used_at touch was last queued, per API key id
+_touches_queued: Dict[int, float] = {}
+_touches_lock = threading.Lock()
 
 def generate_api_key() -> str:
     """Generate a secure random API key"""
@@ -22,14 +34,50 @@ def create_api_key(db: Session, api_key_data: APIKeyCreate) -> APIKey:
     return db_api_key
 
 def get_api_key_by_key(db: Session, key: str) -> APIKey:
-    """Get API key by key string"""
-    return db.query(APIKey).filter(APIKey.key == key, APIKey.is_active == True).first()
+    """Get API key by key string (runs on every authenticated request)"""
+    stmt = lambda_stmt(lambda: select(APIKey).where(APIKey.key == key, APIKey.is_active == True).limit(1))
+    return db.scalars(stmt).first()
 
 def update_last_used(db: Session, api_key: APIKey):
     """Update last used timestamp"""
     api_key.last_used_at = datetime.now()
     db.commit()
 
+def _local_naive(value: datetime) -> datetime:
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+def schedule_last_used_update(api_key: APIKey):
+    """
+    Record key usage in the background instead of committing in the request
+
+    last_used_at is only kept to within `api_key_last_used_resolution_seconds`:
+    nothing is queued while the stored value is that recent, and each process
+    queues at most one touch per key per interval.
+    """
+    resolution = settings.api_key_last_used_resolution_seconds
+    now = datetime.now()
+    if api_key.last_used_at is not None and now - _local_naive(api_key.last_used_at) < timedelta(seconds=resolution):
+        return
+    queued_at = time.monotonic()
+    with _touches_lock:
+        previous = _touches_queued.get(api_key.id)
+        if previous is not None and queued_at - previous < resolution:
+            return
+        if len(_touches_queued) >= 10000:
+            # Forget keys whose interval has passed so the map stays bounded
+            for key_id, at in list(_touches_queued.items()):
+                if queued_at - at >= resolution:
+                    del _touches_queued[key_id]
+        _touches_queued[api_key.id] = queued_at
+    enqueue("api_keys.touch_last_used", api_key_id=api_key.id, used_at=now.isoformat())
+
+def set_last_used(db: Session, api_key_id: int, used_at: datetime):
+    """Set last used timestamp, never moving it backwards"""
+    db.query(APIKey).filter(
+        APIKey.id == api_key_id,
+        or_(APIKey.last_used_at.is_(None), APIKey.last_used_at < used_at)
+    ).update({"last_used_at": used_at}, synchronize_session=False)
+
 def get_all_api_keys(db: Session, skip: int = 0, limit: int = 100):
     """Get all API keys"""
     return db.query(APIKey).offset(skip).limit(limit).all()
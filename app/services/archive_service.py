@@ -0,0 +1,120 @@
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import delete, func, insert, select, union_all
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+from collections import Counter
+from app.models.task import Task, TaskArchive
+from app.schemas.task import TASK_FIELDS
+from app.schemas.pagination import build_pagination_meta
+from app.services import stats_service
+
+ARCHIVED_COLUMNS = (
+    "id", "owner_key_id", "title", "description", "completed",
+    "created_at", "updated_at", "completed_at"
+)
+
+def archive_completed_tasks(db: Session, older_than_days: int, batch_size: int = 1000) -> int:
+    """
+    Move tasks completed more than `older_than_days` ago into tasks_archive
+
+    Works in batches of `batch_size`, each copied with INSERT ... SELECT,
+    deleted from tasks and committed on its own, so locks stay short and
+    the job can be interrupted safely. Returns the number of tasks moved.
+    """
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    moved = 0
+    while True:
+        batch = (
+            db.query(Task.id, Task.owner_key_id)
+            .filter(Task.completed == True, Task.completed_at < cutoff)
+            .order_by(Task.completed_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not batch:
+            db.rollback()
+            return moved
+
+        ids = [task_id for task_id, _ in batch]
+        db.execute(
+            insert(TaskArchive).from_select(
+                ARCHIVED_COLUMNS,
+                select(*(getattr(Task, name) for name in ARCHIVED_COLUMNS)).where(Task.id.in_(ids))
+            )
+        )
+        db.execute(delete(Task).where(Task.id.in_(ids)).execution_options(synchronize_session=False))
+        for owner_id, count in Counter(owner_id for _, owner_id in batch).items():
+            stats_service.record_archived(db, owner_id, count)
+        db.commit()
+        moved += len(ids)
+
+def get_archived_task(
+    db: Session,
+    task_id: int,
+    owner_id: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+):
+    query = db.query(TaskArchive).filter(TaskArchive.owner_key_id == owner_id, TaskArchive.id == task_id)
+    if fields:
+        query = query.options(load_only(*(getattr(TaskArchive, name) for name in fields), raiseload=True))
+    return query.first()
+
+def get_archived_tasks_by_ids(
+    db: Session,
+    task_ids: Sequence[int],
+    owner_id: Optional[int] = None,
+    completed: bool = None,
+    fields: Optional[Sequence[str]] = None
+):
+    query = db.query(TaskArchive).filter(TaskArchive.owner_key_id == owner_id, TaskArchive.id.in_(task_ids))
+    if completed is not None:
+        query = query.filter(TaskArchive.completed == completed)
+    if fields:
+        query = query.options(load_only(*(getattr(TaskArchive, name) for name in fields), raiseload=True))
+    return query.all()
+
+def get_tasks_with_archive_paginated(
+    db: Session,
+    page: int = 1,
+    page_size: int = 10,
+    completed: bool = None,
+    fields: Optional[Sequence[str]] = None,
+    owner_id: Optional[int] = None
+):
+    """
+    Paginate over tasks and tasks_archive together, newest first
+
+    Each table contributes at most offset + page_size rows read along its
+    owner index, so the merge never scans either table in full.
+    """
+    columns = set(fields or TASK_FIELDS) | {"id", "created_at"}
+    offset = (page - 1) * page_size
+
+    def owned(model):
+        condition = [model.owner_key_id == owner_id]
+        if completed is not None:
+            condition.append(model.completed == completed)
+        return condition
+
+    def branch(model):
+        return select(
+            select(*(getattr(model, name) for name in TASK_FIELDS if name in columns))
+            .where(*owned(model))
+            .order_by(model.created_at.desc(), model.id.desc())
+            .limit(offset + page_size)
+            .subquery()
+        )
+
+    total_items = sum(
+        db.scalar(select(func.count(model.id)).where(*owned(model)))
+        for model in (Task, TaskArchive)
+    )
+    combined = union_all(branch(Task), branch(TaskArchive)).subquery()
+    items = db.execute(
+        select(combined)
+        .order_by(combined.c.created_at.desc(), combined.c.id.desc())
+        .offset(offset)
+        .limit(page_size)
+    ).all()
+    return items, build_pagination_meta(total_items, page, page_size)
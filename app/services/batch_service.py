@@ -0,0 +1,62 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+from typing import List, Optional, Tuple
+from app.schemas.batch import BatchOperation, BatchResult
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.services import task_service
+
+NOT_FOUND = (404, {"detail": "Task not found"})
+
+def _task_body(db_task):
+    return TaskResponse.model_validate(db_task).model_dump(mode="json")
+
+def _run_operation(db: Session, operation: BatchOperation, owner_id: Optional[int]) -> Tuple[int, object]:
+    if operation.op == "create":
+        task = TaskCreate.model_validate(operation.data or {})
+        return 201, _task_body(task_service.create_task(db, task, owner_id=owner_id, commit=False))
+
+    if operation.id is None:
+        return 422, {"detail": f"'id' is required for {operation.op}"}
+
+    if operation.op == "get":
+        db_task = task_service.get_task(db, operation.id, owner_id=owner_id)
+        return (200, _task_body(db_task)) if db_task else NOT_FOUND
+
+    if operation.op == "update":
+        task_update = TaskUpdate.model_validate(operation.data or {})
+        db_task = task_service.update_task(
+            db, operation.id, task_update, owner_id=owner_id, commit=False
+        )
+        return (200, _task_body(db_task)) if db_task else NOT_FOUND
+
+    if task_service.delete_task(db, operation.id, owner_id=owner_id, commit=False):
+        return 204, None
+    return NOT_FOUND
+
+def run_batch(
+    db: Session,
+    operations: List[BatchOperation],
+    owner_id: Optional[int] = None
+) -> List[BatchResult]:
+    """
+    Run task operations in one transaction, committed once at the end
+
+    Each operation runs in its own SAVEPOINT so a failing operation (e.g. a
+    duplicate title) is rolled back alone and reported in its result.
+    """
+    results = []
+    for operation in operations:
+        savepoint = db.begin_nested()
+        try:
+            status, body = _run_operation(db, operation, owner_id)
+            savepoint.commit()
+        except ValidationError as e:
+            savepoint.rollback()
+            status, body = 422, {"detail": e.errors(include_url=False)}
+        except IntegrityError:
+            savepoint.rollback()
+            status, body = 400, {"detail": "Task with this title already exists"}
+        results.append(BatchResult(status=status, body=body))
+    db.commit()
+    return results
@@ -0,0 +1,245 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from app.config import get_settings
+from app.models.task import Task
+from app.schemas.pagination import PaginationMeta
+from app.schemas.task import TaskResponse
+
+class _Entry(NamedTuple):
+    sort_key: tuple  # (created_at, id), listed in descending order
+    id: int
+    body: bytes  # TaskResponse JSON
+
+class _OwnerSnapshot:
+    def __init__(self, version: Optional[int]):
+        self.version = version
+        # completed filter (None, True, False) -> newest min(size, n) tasks
+        self.lists: Dict[Optional[bool], List[_Entry]] = {}
+        # completed filter -> number of tasks matching it, for each list
+        self.totals: Dict[Optional[bool], int] = {}
+        self.nbytes = 0
+
+    def measure(self) -> int:
+        return sum(len(entry.body) for entries in self.lists.values() for entry in entries)
+
+def _entry(task: Task) -> _Entry:
+    return _Entry((task.created_at, task.id), task.id, TaskResponse.model_validate(task).model_dump_json().encode())
+
+class FirstPageCache:
+    """
+    Pre-serialized first page of each owner's task listing, per completed filter
+
+    An owner's snapshot is valid for one value of its task_counters version,
+    which every write bumps in its own transaction. Readers compare it with
+    the version they read from the database, so writes from other processes
+    (or batches, archiving, reconciliation) make the snapshot stale rather
+    than wrong. Writes committed by this process are applied in place when
+    the snapshot was exactly one version behind; otherwise it is dropped and
+    rebuilt by the next read.
+
+    Each list holds the newest min(size, n) tasks of its filter, so a list
+    shorter than `size` is the complete result, plus the filter's total as
+    counted when the list was built and adjusted by each applied write.
+
+    Memory is bounded by `max_owners` and by `max_bytes` of serialized tasks,
+    evicting least recently used owners. A list with a task body over
+    `max_entry_bytes` (a long description) is not cached; those listings are
+    served from the database.
+    """
+
+    def __init__(
+        self,
+        size: int = 10,
+        max_owners: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 16 * 1024
+    ):
+        self.size = size
+        self.max_owners = max_owners
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.nbytes = 0
+        self._owners: "OrderedDict[Optional[int], _OwnerSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._owners.clear()
+            self.nbytes = 0
+
+    def has_owner(self, owner_id: Optional[int]) -> bool:
+        return owner_id in self._owners
+
+    def get(
+        self,
+        owner_id: Optional[int],
+        version: Optional[int],
+        completed: Optional[bool]
+    ) -> Optional[Tuple[List[bytes], int]]:
+        """Cached task bodies and total for the filter, or None if missing or stale"""
+        with self._lock:
+            snapshot = self._owners.get(owner_id)
+            if snapshot is None or snapshot.version != version:
+                return None
+            self._owners.move_to_end(owner_id)
+            entries = snapshot.lists.get(completed)
+            if entries is None:
+                return None
+            return [entry.body for entry in entries], snapshot.totals[completed]
+
+    def put(
+        self,
+        owner_id: Optional[int],
+        version: Optional[int],
+        completed: Optional[bool],
+        tasks: Sequence[Task],
+        total: int
+    ) -> List[bytes]:
+        """Store the newest tasks for a filter and its total, as read at `version`"""
+        entries = [_entry(task) for task in tasks[:self.size]]
+        bodies = [entry.body for entry in entries]
+        if any(len(body) > self.max_entry_bytes for body in bodies):
+            return bodies
+        with self._lock:
+            snapshot = self._owners.get(owner_id)
+            if snapshot is None or snapshot.version != version:
+                if snapshot is not None and version is not None and (snapshot.version or 0) > version:
+                    # A newer write was applied meanwhile; don't roll it back
+                    return bodies
+                if snapshot is not None:
+                    self._drop(owner_id)
+                snapshot = self._owners[owner_id] = _OwnerSnapshot(version)
+            snapshot.lists[completed] = entries
+            snapshot.totals[completed] = total
+            self._owners.move_to_end(owner_id)
+            self._resized(snapshot)
+        return bodies
+
+    def _drop(self, owner_id: Optional[int]):
+        snapshot = self._owners.pop(owner_id, None)
+        if snapshot is not None:
+            self.nbytes -= snapshot.nbytes
+
+    def _resized(self, snapshot: _OwnerSnapshot):
+        """Account for a changed snapshot and evict owners over the limits"""
+        nbytes = snapshot.measure()
+        self.nbytes += nbytes - snapshot.nbytes
+        snapshot.nbytes = nbytes
+        while self._owners and (len(self._owners) > self.max_owners or self.nbytes > self.max_bytes):
+            _, evicted = self._owners.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def _advance(self, owner_id: Optional[int], version: Optional[int]) -> Optional[_OwnerSnapshot]:
+        """The owner's snapshot moved to `version`, or None if it can't be updated in place"""
+        snapshot = self._owners.get(owner_id)
+        if snapshot is None:
+            return None
+        if version is None or snapshot.version is None or snapshot.version != version - 1:
+            self._drop(owner_id)
+            return None
+        snapshot.version = version
+        return snapshot
+
+    def _count(self, snapshot: _OwnerSnapshot, completed: Optional[bool], delta: int):
+        if completed in snapshot.totals:
+            snapshot.totals[completed] += delta
+
+    def _insert(self, snapshot: _OwnerSnapshot, completed: Optional[bool], entry: _Entry):
+        entries = snapshot.lists.get(completed)
+        if entries is None:
+            return
+        if len(entries) >= self.size and entry.sort_key <= entries[-1].sort_key:
+            return
+        index = next((i for i, other in enumerate(entries) if other.sort_key < entry.sort_key), len(entries))
+        entries.insert(index, entry)
+        del entries[self.size:]
+
+    def _remove(self, snapshot: _OwnerSnapshot, completed: Optional[bool], task_id: int):
+        entries = snapshot.lists.get(completed)
+        if entries is None:
+            return
+        for index, entry in enumerate(entries):
+            if entry.id == task_id:
+                if len(entries) >= self.size:
+                    # The task that moves up into the list is unknown
+                    del snapshot.lists[completed]
+                    del snapshot.totals[completed]
+                else:
+                    del entries[index]
+                return
+
+    def _replace(self, snapshot: _OwnerSnapshot, completed: Optional[bool], entry: _Entry):
+        entries = snapshot.lists.get(completed) or []
+        for index, other in enumerate(entries):
+            if other.id == entry.id:
+                entries[index] = entry
+                return
+
+    def _apply(self, owner_id: Optional[int], version: Optional[int], entry: Optional[_Entry]):
+        """The snapshot to apply a write to, or None; drops it if `entry` is too large to cache"""
+        if entry is not None and len(entry.body) > self.max_entry_bytes:
+            self._drop(owner_id)
+            return None
+        return self._advance(owner_id, version)
+
+    def apply_created(self, task: Task, version: Optional[int]):
+        """Apply a committed create; `version` is the owner's version it committed"""
+        if not self.has_owner(task.owner_key_id):
+            # A snapshot stored meanwhile was read before this commit, so
+            # its version is behind and it is never served
+            return
+        entry = _entry(task)
+        completed = bool(task.completed)
+        with self._lock:
+            snapshot = self._apply(task.owner_key_id, version, entry)
+            if snapshot is not None:
+                self._count(snapshot, None, 1)
+                self._count(snapshot, completed, 1)
+                self._insert(snapshot, None, entry)
+                self._insert(snapshot, completed, entry)
+                self._resized(snapshot)
+
+    def apply_updated(self, task: Task, was_completed: bool, version: Optional[int]):
+        if not self.has_owner(task.owner_key_id):
+            return
+        entry = _entry(task)
+        completed = bool(task.completed)
+        with self._lock:
+            snapshot = self._apply(task.owner_key_id, version, entry)
+            if snapshot is None:
+                return
+            self._replace(snapshot, None, entry)
+            if completed == was_completed:
+                self._replace(snapshot, completed, entry)
+            else:
+                self._count(snapshot, was_completed, -1)
+                self._count(snapshot, completed, 1)
+                self._remove(snapshot, was_completed, task.id)
+                self._insert(snapshot, completed, entry)
+            self._resized(snapshot)
+
+    def apply_deleted(self, owner_id: Optional[int], task_id: int, completed: bool, version: Optional[int]):
+        with self._lock:
+            snapshot = self._apply(owner_id, version, None)
+            if snapshot is not None:
+                self._count(snapshot, None, -1)
+                self._count(snapshot, completed, -1)
+                self._remove(snapshot, None, task_id)
+                self._remove(snapshot, completed, task_id)
+                self._resized(snapshot)
+
+def render_page(bodies: Sequence[bytes], pagination: PaginationMeta) -> bytes:
+    """Assemble a PaginatedResponse[TaskResponse] body from serialized tasks"""
+    return (
+        b'{"items":[' + b",".join(bodies) + b'],"pagination":'
+        + pagination.model_dump_json().encode() + b"}"
+    )
+
+settings = get_settings()
+first_pages = FirstPageCache(
+    settings.first_page_snapshot_size,
+    settings.first_page_snapshot_max_owners,
+    settings.first_page_snapshot_max_bytes,
+    settings.first_page_snapshot_max_entry_bytes
+)
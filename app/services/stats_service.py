@@ -0,0 +1,208 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, insert, update, delete, select, lambda_stmt
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import date, datetime, timedelta
+from typing import Optional
+from app.models.task import Task, TaskArchive
+from app.models.task_stats import TaskCounters, TaskDailyStats, UNOWNED_KEY_ID
+
+def _stats_key(owner_id: Optional[int]) -> int:
+    return UNOWNED_KEY_ID if owner_id is None else owner_id
+
+def _as_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    # SQLite returns DATE() results as ISO strings
+    return date.fromisoformat(str(value)[:10])
+
+def _upsert_increment(db: Session, model, key: dict, increments: dict, **on_update):
+    """
+    Add `increments` to the row at `key`, inserting it with them if missing
+
+    Done as one INSERT ... ON DUPLICATE KEY UPDATE (ON CONFLICT on SQLite),
+    so concurrent first writes to a key can't deadlock on gap locks or fail
+    with a duplicate key. `on_update` sets extra columns on existing rows.
+    """
+    table = model.__table__
+    updates = {name: table.c[name] + amount for name, amount in increments.items()}
+    updates.update(on_update)
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        db.execute(mysql_insert(table).values(**key, **increments).on_duplicate_key_update(**updates))
+    elif dialect == "sqlite":
+        db.execute(
+            sqlite_insert(table).values(**key, **increments)
+            .on_conflict_do_update(index_elements=list(key), set_=updates)
+        )
+    else:
+        # Other databases: update, then insert the row if there was none
+        result = db.execute(
+            update(table)
+            .where(*(table.c[name] == value for name, value in key.items()))
+            .values(**updates)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table).values(**key, **increments))
+
+def _bump_counters(
+    db: Session,
+    owner_id: Optional[int],
+    total: int = 0,
+    completed: int = 0,
+    archived: int = 0
+):
+    """
+    Atomically increment an owner's counters row, creating it on first use
+
+    Also bumps the row's version, which marks every write to the owner's tasks.
+    """
+    _upsert_increment(
+        db, TaskCounters,
+        {"owner_key_id": _stats_key(owner_id)},
+        {"total": total, "completed": completed, "archived": archived},
+        version=TaskCounters.version + 1,
+        updated_at=func.now()
+    )
+
+def _bump_day(db: Session, owner_id: Optional[int], day: Optional[date], created: int = 0, completed: int = 0):
+    """Atomically increment an owner's histogram bucket, creating it on first use"""
+    if day is None:
+        return
+    _upsert_increment(
+        db, TaskDailyStats,
+        {"owner_key_id": _stats_key(owner_id), "day": day},
+        {"created": created, "completed": completed}
+    )
+
+def record_created(db: Session, task: Task):
+    """Account for a newly inserted (flushed, not yet committed) task"""
+    owner_id = task.owner_key_id
+    _bump_counters(db, owner_id, total=1, completed=1 if task.completed else 0)
+    _bump_day(db, owner_id, _as_date(task.created_at), created=1)
+    if task.completed:
+        _bump_day(db, owner_id, _as_date(task.completed_at), completed=1)
+
+def record_completion_change(db: Session, task: Task, previous_completed_at: Optional[datetime]):
+    """Account for a task whose completed flag flipped in the current transaction"""
+    owner_id = task.owner_key_id
+    if task.completed:
+        _bump_counters(db, owner_id, completed=1)
+        _bump_day(db, owner_id, _as_date(task.completed_at), completed=1)
+    else:
+        _bump_counters(db, owner_id, completed=-1)
+        _bump_day(db, owner_id, _as_date(previous_completed_at), completed=-1)
+
+def record_deleted(db: Session, task: Task):
+    """Account for a task deleted in the current transaction"""
+    owner_id = task.owner_key_id
+    _bump_counters(db, owner_id, total=-1, completed=-1 if task.completed else 0)
+    _bump_day(db, owner_id, _as_date(task.created_at), created=-1)
+    if task.completed:
+        _bump_day(db, owner_id, _as_date(task.completed_at), completed=-1)
+
+def record_changed(db: Session, task: Task):
+    """Account for a task edited without changing any count (bumps the version)"""
+    _bump_counters(db, task.owner_key_id)
+
+def record_archived(db: Session, owner_id: Optional[int], count: int):
+    """Account for `count` completed tasks moved to tasks_archive"""
+    _bump_counters(db, owner_id, archived=count)
+
+def get_counters(db: Session, owner_id: Optional[int] = None) -> TaskCounters:
+    """An owner's totals; a transient zeroed row if they never wrote a task"""
+    key = _stats_key(owner_id)
+    counters = db.get(TaskCounters, key)
+    return counters or TaskCounters(owner_key_id=key, total=0, completed=0, archived=0)
+
+def get_version(db: Session, owner_id: Optional[int] = None) -> Optional[int]:
+    """
+    The owner's current version as seen by this transaction, None before any write
+
+    Read on every first-page listing, so it is a cached lambda statement.
+    """
+    key = _stats_key(owner_id)
+    return db.scalar(lambda_stmt(lambda: select(TaskCounters.version).where(TaskCounters.owner_key_id == key)))
+
+def get_stats(db: Session, owner_id: Optional[int] = None, days: int = 30):
+    """Totals plus per-day created/completed counts for the last `days` days"""
+    counters = get_counters(db, owner_id)
+    since = date.today() - timedelta(days=days - 1)
+    history = (
+        db.query(TaskDailyStats)
+        .filter(TaskDailyStats.owner_key_id == _stats_key(owner_id), TaskDailyStats.day >= since)
+        .order_by(TaskDailyStats.day)
+        .all()
+    )
+    return {
+        "total": counters.total,
+        "completed": counters.completed,
+        "pending": counters.total - counters.completed,
+        "daily": [
+            {"day": row.day, "created": row.created, "completed": row.completed}
+            for row in history
+            if row.created or row.completed
+        ]
+    }
+
+def reconcile(db: Session):
+    """
+    Recompute every owner's counters and histograms from tasks and tasks_archive
+
+    Counter rows are locked first; writers update them before the
+    histograms, so concurrent writes wait instead of being lost. Versions
+    are bumped since totals may change. Returns the counters keyed by
+    owner key id.
+    """
+    counters = {
+        row.owner_key_id: row
+        for row in db.query(TaskCounters).with_for_update()
+    }
+    for row in counters.values():
+        row.total = row.completed = row.archived = 0
+        row.version += 1
+
+    buckets = {}
+    for model in (Task, TaskArchive):
+        owner_key = func.coalesce(model.owner_key_id, UNOWNED_KEY_ID)
+        totals = db.query(
+            owner_key,
+            func.count(model.id),
+            func.coalesce(func.sum(case((model.completed == True, 1), else_=0)), 0)
+        ).group_by(owner_key)
+        for key, total, completed in totals:
+            row = counters.get(key)
+            if row is None:
+                row = counters[key] = TaskCounters(owner_key_id=key, total=0, completed=0, archived=0)
+                db.add(row)
+            row.total += total
+            row.completed += completed
+            if model is TaskArchive:
+                row.archived += total
+
+        created_rows = (
+            db.query(owner_key, func.date(model.created_at), func.count(model.id))
+            .filter(model.created_at.isnot(None))
+            .group_by(owner_key, func.date(model.created_at))
+        )
+        for key, day, count in created_rows:
+            buckets.setdefault((key, _as_date(day)), [0, 0])[0] += count
+        completed_rows = (
+            db.query(owner_key, func.date(model.completed_at), func.count(model.id))
+            .filter(model.completed == True, model.completed_at.isnot(None))
+            .group_by(owner_key, func.date(model.completed_at))
+        )
+        for key, day, count in completed_rows:
+            buckets.setdefault((key, _as_date(day)), [0, 0])[1] += count
+
+    db.execute(delete(TaskDailyStats))
+    db.add_all(
+        TaskDailyStats(owner_key_id=key, day=day, created=created, completed=completed)
+        for (key, day), (created, completed) in buckets.items()
+    )
+    db.commit()
+    return counters
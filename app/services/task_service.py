@@ -1,70 +1,245 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, lambda_stmt, select
+from typing import Optional, Sequence
+from datetime import datetime
 from app.models.task import Task
+from app.config import get_settings
 from app.schemas.task import TaskCreate, TaskUpdate
-from app.schemas.pagination import paginate_query
+from app.schemas.pagination import build_pagination_meta
+from app.services import archive_service, stats_service
+from app.services.first_page_cache import first_pages, render_page
 
-def create_task(db: Session, task: TaskCreate):
-    db_task = Task(**task.model_dump())
+settings = get_settings()
+
+# Every function takes the owning API key id. None addresses tasks without
+# an owner (rows created before ownership existed, or by internal callers).
+
+def _new_task(task: TaskCreate, owner_id: Optional[int]) -> Task:
+    db_task = Task(**task.model_dump(), owner_key_id=owner_id)
+    if db_task.completed:
+        db_task.completed_at = datetime.now()
+    return db_task
+
+def _record_created(db: Session, db_task: Task):
+    """Flush the new row, load its server-side created_at and update stats"""
+    db.flush()
+    db.refresh(db_task, ["created_at"])
+    stats_service.record_created(db, db_task)
+
+def _finish(db: Session, db_task: Task, commit: bool):
+    """Commit and reload, or leave the change pending in the caller's transaction"""
+    if commit:
+        db.commit()
+        db.refresh(db_task)
+    else:
+        db.flush()
+
+def _version_to_apply(db: Session, owner_id: Optional[int], commit: bool) -> Optional[int]:
+    """The version this transaction commits, if there is a first-page snapshot to update"""
+    if commit and first_pages.has_owner(owner_id):
+        return stats_service.get_version(db, owner_id)
+    return None
+
+def create_task(db: Session, task: TaskCreate, owner_id: Optional[int] = None, commit: bool = True):
+    db_task = _new_task(task, owner_id)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    _record_created(db, db_task)
+    version = _version_to_apply(db, owner_id, commit)
+    _finish(db, db_task, commit)
+    if commit:
+        first_pages.apply_created(db_task, version)
     return db_task
 
-def get_task(db: Session, task_id: int):
-    return db.query(Task).filter(Task.id == task_id).first()
+def _owned_tasks(db: Session, owner_id: Optional[int], fields: Optional[Sequence[str]] = None):
+    """Query the owner's tasks, restricted to the given columns if any"""
+    query = db.query(Task).filter(Task.owner_key_id == owner_id)
+    if not fields:
+        return query
+    # Columns outside `fields` raise if accessed instead of lazy-loading
+    return query.options(load_only(*(getattr(Task, name) for name in fields), raiseload=True))
 
-def get_tasks(db: Session, skip: int = 0, limit: int = 100, completed: bool = None):
-    query = db.query(Task)
+# The hot reads (get_task, get_tasks_paginated) are built from lambda
+# statements: each lambda is analysed once per call site and the resulting
+# SQL is served from the engine's compiled cache, so a call only pays for
+# binding its values. Closure variables become bound parameters.
+
+def _where_owned(stmt, owner_id: Optional[int], completed: bool = None):
+    if owner_id is None:
+        stmt += lambda s: s.where(Task.owner_key_id.is_(None))
+    else:
+        stmt += lambda s: s.where(Task.owner_key_id == owner_id)
+    if completed is not None:
+        stmt += lambda s: s.where(Task.completed == completed)
+    return stmt
+
+def _with_fields(stmt, fields: Optional[Sequence[str]]):
+    if not fields:
+        return stmt
+    # Columns outside `fields` raise if accessed instead of lazy-loading
+    option = load_only(*(getattr(Task, name) for name in fields), raiseload=True)
+    return stmt.add_criteria(lambda s: s.options(option), track_on=[option])
+
+def get_task(
+    db: Session,
+    task_id: int,
+    owner_id: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    include_archived: bool = False
+):
+    # One lambda per owner variant: each linked lambda adds per-call cost
+    if owner_id is None:
+        stmt = lambda_stmt(lambda: select(Task).where(Task.owner_key_id.is_(None), Task.id == task_id).limit(1))
+    else:
+        stmt = lambda_stmt(lambda: select(Task).where(Task.owner_key_id == owner_id, Task.id == task_id).limit(1))
+    db_task = db.scalars(_with_fields(stmt, fields)).first()
+    if db_task is None and include_archived:
+        return archive_service.get_archived_task(db, task_id, owner_id, fields)
+    return db_task
+
+def get_tasks_by_ids(
+    db: Session,
+    task_ids: Sequence[int],
+    owner_id: Optional[int] = None,
+    completed: bool = None,
+    fields: Optional[Sequence[str]] = None,
+    include_archived: bool = False
+):
+    """Fetch several tasks with a single IN query, in the order the ids were given"""
+    query = _owned_tasks(db, owner_id, fields).filter(Task.id.in_(task_ids))
     if completed is not None:
         query = query.filter(Task.completed == completed)
-    return query.offset(skip).limit(limit).all()
+    by_id = {task.id: task for task in query}
+    missing = [task_id for task_id in task_ids if task_id not in by_id]
+    if missing and include_archived:
+        archived = archive_service.get_archived_tasks_by_ids(db, missing, owner_id, completed, fields)
+        by_id.update((task.id, task) for task in archived)
+    return [by_id[task_id] for task_id in task_ids if task_id in by_id]
 
-def get_tasks_paginated(db: Session, page: int = 1, page_size: int = 10, completed: bool = None):
-    """Get tasks with proper pagination"""
-    query = db.query(Task)
+def get_tasks(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    completed: bool = None,
+    owner_id: Optional[int] = None
+):
+    query = _owned_tasks(db, owner_id)
     if completed is not None:
         query = query.filter(Task.completed == completed)
-    query = query.order_by(Task.created_at.desc())
-    return paginate_query(query, page, page_size)
+    return query.offset(skip).limit(limit).all()
+
+def get_tasks_paginated(
+    db: Session,
+    page: int = 1,
+    page_size: int = 10,
+    completed: bool = None,
+    fields: Optional[Sequence[str]] = None,
+    owner_id: Optional[int] = None,
+    include_archived: bool = False
+):
+    """Get tasks with proper pagination, optionally loading only some columns"""
+    if include_archived:
+        return archive_service.get_tasks_with_archive_paginated(
+            db, page=page, page_size=page_size, completed=completed, fields=fields, owner_id=owner_id
+        )
+    total_items = db.scalar(_where_owned(lambda_stmt(lambda: select(func.count(Task.id))), owner_id, completed))
+
+    offset = (page - 1) * page_size
+    # Ordering matches ix_tasks_owner_created / ix_tasks_owner_completed_created
+    stmt = lambda_stmt(
+        lambda: select(Task).order_by(Task.created_at.desc(), Task.id.desc()).offset(offset).limit(page_size)
+    )
+    stmt = _with_fields(_where_owned(stmt, owner_id, completed), fields)
+    return db.scalars(stmt).all(), build_pagination_meta(total_items, page, page_size)
+
+def get_first_page(db: Session, owner_id: Optional[int], completed: bool = None, page_size: int = 10) -> bytes:
+    """
+    Page 1 of get_tasks_paginated as a serialized PaginatedResponse
+
+    Served from the first-page snapshot when it matches the owner's counters
+    version, otherwise rebuilt from the database. The total is counted when
+    the snapshot is rebuilt, like get_tasks_paginated does, so drift in
+    task_counters never shows up in total_items.
+    """
+    version = stats_service.get_version(db, owner_id)
+    cached = first_pages.get(owner_id, version, completed)
+    if cached is None:
+        total_items = db.scalar(_where_owned(lambda_stmt(lambda: select(func.count(Task.id))), owner_id, completed))
+        size = first_pages.size
+        stmt = lambda_stmt(
+            lambda: select(Task).order_by(Task.created_at.desc(), Task.id.desc()).limit(size)
+        )
+        tasks = db.scalars(_where_owned(stmt, owner_id, completed)).all()
+        bodies = first_pages.put(owner_id, version, completed, tasks, total_items)
+    else:
+        bodies, total_items = cached
+    return render_page(bodies[:page_size], build_pagination_meta(total_items, 1, page_size))
 
-def update_task(db: Session, task_id: int, task_update: TaskUpdate):
-    db_task = get_task(db, task_id)
+def update_task(
+    db: Session,
+    task_id: int,
+    task_update: TaskUpdate,
+    owner_id: Optional[int] = None,
+    commit: bool = True
+):
+    db_task = get_task(db, task_id, owner_id)
     if not db_task:
         return None
-    
+
+    was_completed = bool(db_task.completed)
+    previous_completed_at = db_task.completed_at
     update_data = task_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_task, field, value)
-    
-    db.commit()
-    db.refresh(db_task)
+
+    if bool(db_task.completed) != was_completed:
+        db_task.completed_at = datetime.now() if db_task.completed else None
+        stats_service.record_completion_change(db, db_task, previous_completed_at)
+    elif settings.first_page_snapshot_enabled:
+        # Only snapshots need edits to bump the version; it also invalidates
+        # snapshots held by other processes, so it can't depend on this one's
+        stats_service.record_changed(db, db_task)
+
+    version = _version_to_apply(db, owner_id, commit)
+    _finish(db, db_task, commit)
+    if commit:
+        first_pages.apply_updated(db_task, was_completed, version)
     return db_task
 
-def delete_task(db: Session, task_id: int):
-    db_task = get_task(db, task_id)
+def delete_task(db: Session, task_id: int, owner_id: Optional[int] = None, commit: bool = True):
+    db_task = get_task(db, task_id, owner_id)
     if db_task:
+        completed = bool(db_task.completed)
+        stats_service.record_deleted(db, db_task)
+        version = _version_to_apply(db, owner_id, commit)
         db.delete(db_task)
-        db.commit()
+        if commit:
+            db.commit()
+            first_pages.apply_deleted(owner_id, task_id, completed, version)
+        else:
+            db.flush()
         return True
     return False
 
-def get_completed_count(db: Session):
-    """Custom SQL query to count completed tasks"""
-    return db.query(func.count(Task.id)).filter(Task.completed == True).scalar()
+def get_completed_count(db: Session, owner_id: Optional[int] = None):
+    """Count completed tasks from the maintained counters (O(1))"""
+    return stats_service.get_counters(db, owner_id).completed
 
-def create_task_with_transaction(db: Session, task: TaskCreate):
+def get_stats(db: Session, owner_id: Optional[int] = None, days: int = 30):
+    return stats_service.get_stats(db, owner_id, days)
+
+def create_task_with_transaction(db: Session, task: TaskCreate, owner_id: Optional[int] = None):
     """Demonstrates transaction handling"""
     try:
-        db_task = Task(**task.model_dump())
+        db_task = Task(**task.model_dump(), owner_key_id=owner_id)
         db.add(db_task)
         db.flush()
-        
+
         db_task.completed = False
+        db_task.completed_at = None
+        _record_created(db, db_task)
         db.commit()
         db.refresh(db_task)
         return db_task
     except Exception as e:
         db.rollback()
         raise e
-
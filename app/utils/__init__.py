@@ -1,10 +1,11 @@
-from app.utils.response_utils import success_response, error_response
+from app.utils.response_utils import success_response, error_response, RawJSONResponse
 from app.utils.validators import validate_email, validate_string_length, sanitize_string
 from app.utils.datetime_utils import get_current_timestamp, format_datetime, add_days, is_expired
 
 __all__ = [
     "success_response",
     "error_response",
+    "RawJSONResponse",
     "validate_email",
     "validate_string_length",
     "sanitize_string",
@@ -0,0 +1,12 @@
+from fastapi import Response
+
+def cache_control(policy: str):
+    """
+    Build a route dependency that sets the Cache-Control header
+
+    Usage:
+        @router.get("/", dependencies=[Depends(cache_control("no-store"))])
+    """
+    def set_cache_control(response: Response):
+        response.headers["Cache-Control"] = policy
+    return set_cache_control
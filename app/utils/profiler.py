@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional, Set, Tuple
+
+# Innermost frames of a thread that is waiting rather than running code
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    # a threadpool worker waking the event loop with its result
+    ("selector_events.py", "_write_to_self"),
+}
+
+_PATH_PREFIXES = ("site-packages" + os.sep, os.getcwd() + os.sep)
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for marker in _PATH_PREFIXES:
+        _, found, rest = filename.partition(marker)
+        if found:
+            filename = rest
+            break
+    return f"{code.co_name} ({filename})"
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler for the threads serving one request
+
+    A daemon thread snapshots the stacks of the registered threads, and of
+    every thread named `thread_name` (e.g. the threadpool's workers), every
+    `interval` seconds with sys._current_frames(). Stacks of threads that are
+    only waiting (event loop select, idle workers) are not counted. Results
+    are exported in the folded format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_name: Optional[str] = None):
+        self.interval = interval
+        self.thread_name = thread_name
+        self.samples: Counter = Counter()
+        self._threads: Set[int] = set()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def add_thread(self, ident: int):
+        self._threads.add(ident)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _sampled_threads(self) -> Set[int]:
+        if self.thread_name is None:
+            return set(self._threads)
+        return self._threads | {
+            thread.ident for thread in threading.enumerate() if thread.name == self.thread_name
+        }
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in self._sampled_threads():
+                frame = frames.get(ident)
+                if frame is not None:
+                    self._sample(frame)
+
+    def _sample(self, frame):
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+            return
+        stack: List[str] = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        self.samples[tuple(reversed(stack))] += 1
+
+    def folded(self) -> Iterable[str]:
+        """One "outer;...;inner count" line per distinct stack"""
+        for stack, count in self.samples.most_common():
+            yield ";".join(stack) + f" {count}"
+
+    def hottest(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Innermost frames by number of samples"""
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack[-1]] += count
+        return leaves.most_common(limit)
@@ -0,0 +1,58 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+class DeadlineExceeded(Exception):
+    """The request ran past its deadline; remaining work is abandoned"""
+
+class RequestContext:
+    """
+    Per-request state shared between middleware, dependencies and engine events
+
+    Set by middleware for the duration of a request. FastAPI copies the
+    context into threadpool workers, and since this object is mutable, SQL
+    timings recorded there are visible to the middleware afterwards.
+    """
+
+    def __init__(self, deadline: Optional[float] = None):
+        self.deadline = deadline  # time.monotonic() value, or None
+        self.db_statements = 0
+        self.db_time = 0.0
+        self.deadline_exceeded = False
+        # Set by profiling / statement accounting; None keeps the hot path cheap
+        self.statements: Optional[List[Dict]] = None
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def check_deadline(self):
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            self.deadline_exceeded = True
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    def record_statement(self, duration: float, statement: Optional[str] = None, rows: Optional[int] = None):
+        self.db_statements += 1
+        self.db_time += duration
+        if self.statements is not None:
+            self.statements.append({"statement": statement, "duration": duration, "rows": rows})
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+def get_request_context() -> Optional[RequestContext]:
+    return _current.get()
+
+def set_request_context(context: Optional[RequestContext]):
+    """Install `context` for the current request; returns a token for reset"""
+    return _current.set(context)
+
+def reset_request_context(token):
+    _current.reset(token)
+
+def check_deadline():
+    """Raise DeadlineExceeded if the current request is past its deadline"""
+    context = _current.get()
+    if context is not None:
+        context.check_deadline()
@@ -1,4 +1,5 @@
 from typing import Dict, Any, Optional
+from fastapi import Response
 
 def success_response(data: Any, message: str = "Success") -> Dict[str, Any]:
     """Create a standardized success response"""
@@ -18,3 +19,17 @@ def error_response(message: str, error_code: Optional[str] = None) -> Dict[str,
         response["error_code"] = error_code
     return response
 
+
+class RawJSONResponse(Response):
+    """
+    JSON response for bodies that are already serialized
+
+    The bytes are sent as-is, skipping json encoding and response_model
+    validation. Useful for payloads cached in their serialized form.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return content if isinstance(content, bytes) else bytes(content)
+        return super().render(content)
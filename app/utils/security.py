@@ -25,6 +25,6 @@ def verify_api_key(
             detail="Invalid API Key"
         )
     
-    api_key_service.update_last_used(db, db_api_key)
+    api_key_service.schedule_last_used_update(db_api_key)
     return db_api_key
 
@@ -0,0 +1,93 @@
+"""
+Benchmark response compression on large task listings
+
+Seeds an in-memory SQLite database with tasks carrying long descriptions and
+requests GET /items/?page_size=100 with different Accept-Encoding headers,
+reporting bytes on the wire and latency for each.
+
+Usage:
+    python -m benchmarks.bench_compression [--requests 200] [--description-size 2000]
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_USER", "bench")
+os.environ.setdefault("DATABASE_PASSWORD", "bench")
+os.environ.setdefault("DATABASE_NAME", "bench")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.database import Base, get_db
+from app.middleware.compression import brotli
+
+engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+)
+BenchSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    db = BenchSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def seed(client: TestClient, task_count: int, description_size: int) -> dict:
+    api_key = client.post("/api-keys/generate", json={"name": "bench"}).json()["key"]
+    headers = {"X-API-Key": api_key}
+    words = "lorem ipsum dolor sit amet consectetur adipiscing elit "
+    description = (words * (description_size // len(words) + 1))[:description_size]
+    for i in range(task_count):
+        client.post("/items/", headers=headers, json={
+            "title": f"Benchmark task {i}",
+            "description": description,
+            "completed": i % 3 == 0
+        })
+    return headers
+
+def measure(client: TestClient, headers: dict, encoding: str, requests: int):
+    request_headers = dict(headers, **{"Accept-Encoding": encoding})
+    timings = []
+    wire_bytes = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get("/items/?page_size=100", headers=request_headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        wire_bytes = int(response.headers["content-length"])
+    return wire_bytes, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--description-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    headers = seed(client, args.tasks, args.description_size)
+
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    baseline = None
+    print(f"{'encoding':<10} {'bytes':>10} {'ratio':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for encoding in encodings:
+        wire_bytes, timings = measure(client, headers, encoding, args.requests)
+        baseline = baseline or wire_bytes
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(
+            f"{encoding:<10} {wire_bytes:>10} {wire_bytes / baseline:>7.2f} "
+            f"{statistics.median(timings):>8.2f} {p95:>8.2f}"
+        )
+    if brotli is None:
+        print("brotli not installed; install 'brotli' to enable br encoding")
+
+if __name__ == "__main__":
+    main()
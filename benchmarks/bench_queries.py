@@ -0,0 +1,121 @@
+"""
+Benchmark per-call overhead of the hot service queries
+
+Calls task_service.get_task, task_service.get_tasks_paginated and
+api_key_service.get_api_key_by_key against an in-memory SQLite database,
+next to the legacy db.query(...) versions they replaced, and reports the
+time per call split into time inside the driver and everything else
+(statement construction, compilation, ORM loading). Also compares building
+the default GET /items/ body from queries with the first-page snapshot.
+
+Usage:
+    python -m benchmarks.bench_queries [--calls 2000] [--cache-size 500]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_USER", "bench")
+os.environ.setdefault("DATABASE_PASSWORD", "bench")
+os.environ.setdefault("DATABASE_NAME", "bench")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.api_key import APIKey
+from app.models.task import Task
+from app.schemas.api_key import APIKeyCreate
+from app.schemas.pagination import PaginatedResponse, paginate_query
+from app.schemas.task import TaskCreate, TaskResponse
+from app.services import api_key_service, task_service
+
+# The implementations before the move to cached lambda statements
+def legacy_get_task(db, task_id, owner_id):
+    return db.query(Task).filter(Task.owner_key_id == owner_id, Task.id == task_id).first()
+
+def legacy_get_tasks_paginated(db, page, page_size, owner_id):
+    query = db.query(Task).filter(Task.owner_key_id == owner_id)
+    return paginate_query(query.order_by(Task.created_at.desc(), Task.id.desc()), page, page_size)
+
+def legacy_get_api_key_by_key(db, key):
+    return db.query(APIKey).filter(APIKey.key == key, APIKey.is_active == True).first()
+
+def serialized_first_page(db, owner_id):
+    """Page 1 of GET /items/ without the snapshot: count, page query, serialization"""
+    db.expire_all()  # each request has its own session
+    items, meta = task_service.get_tasks_paginated(db, 1, 10, owner_id=owner_id)
+    return PaginatedResponse[TaskResponse](items=items, pagination=meta).model_dump_json()
+
+def snapshot_first_page(db, owner_id):
+    db.expire_all()
+    return task_service.get_first_page(db, owner_id, page_size=10)
+
+class DriverTimer:
+    """Accumulates time spent inside cursor.execute()"""
+
+    def __init__(self, engine):
+        self.total = 0.0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.total += time.perf_counter() - self._started
+
+def seed(db: Session, tasks: int):
+    api_key = api_key_service.create_api_key(db, APIKeyCreate(name="bench"))
+    task_ids = [
+        task_service.create_task(db, TaskCreate(title=f"Benchmark task {i}"), owner_id=api_key.id).id
+        for i in range(tasks)
+    ]
+    return api_key.id, api_key.key, task_ids
+
+def measure(db: Session, timer: DriverTimer, call, calls: int):
+    call()  # warm up caches
+    timer.total = 0.0
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    elapsed = time.perf_counter() - start
+    return elapsed / calls * 1e6, (elapsed - timer.total) / calls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--cache-size", type=int, default=500, help="engine query_cache_size")
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False},
+        poolclass=StaticPool, query_cache_size=args.cache_size
+    )
+    Base.metadata.create_all(bind=engine)
+    timer = DriverTimer(engine)
+    db = Session(engine)
+    owner_id, key, task_ids = seed(db, args.tasks)
+    task_id = task_ids[len(task_ids) // 2]
+
+    cases = [
+        ("get_task", "legacy", lambda: legacy_get_task(db, task_id, owner_id)),
+        ("get_task", "lambda", lambda: task_service.get_task(db, task_id, owner_id)),
+        ("get_tasks_paginated", "legacy", lambda: legacy_get_tasks_paginated(db, 3, 10, owner_id)),
+        ("get_tasks_paginated", "lambda", lambda: task_service.get_tasks_paginated(db, 3, 10, owner_id=owner_id)),
+        ("get_api_key_by_key", "legacy", lambda: legacy_get_api_key_by_key(db, key)),
+        ("get_api_key_by_key", "lambda", lambda: api_key_service.get_api_key_by_key(db, key)),
+        ("first page", "query", lambda: serialized_first_page(db, owner_id)),
+        ("first page", "snapshot", lambda: snapshot_first_page(db, owner_id)),
+    ]
+
+    print(f"query_cache_size={args.cache_size}, {args.calls} calls each")
+    print(f"{'function':<22} {'version':<8} {'us/call':>9} {'non-driver us':>14}")
+    for name, version, call in cases:
+        per_call, overhead = measure(db, timer, call, args.calls)
+        print(f"{name:<22} {version:<8} {per_call:>9.1f} {overhead:>14.1f}")
+
+if __name__ == "__main__":
+    main()
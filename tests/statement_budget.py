@@ -0,0 +1,59 @@
+"""
+Count the SQL statements and rows behind a block of code
+
+    with StatementRecorder(engine) as recorder:
+        client.get(f"/items/{task_id}", headers=auth_headers)
+    recorder.assert_within(2)
+
+Statements are counted through the engine's cursor events. Rows are ORM
+objects loaded plus rows affected by INSERT/UPDATE/DELETE. SQLite does not
+report row counts for SELECT, and Core (non-ORM) SELECT rows are not counted.
+"""
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.database import Base
+
+class StatementBudgetExceeded(AssertionError):
+    pass
+
+class StatementRecorder:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[Tuple[str, object]] = []
+        self.rows = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(Base, "load", self._on_load, propagate=True)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(Base, "load", self._on_load)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+        if not statement.lstrip().upper().startswith("SELECT") and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+    def _on_load(self, target, context):
+        self.rows += 1
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def report(self) -> str:
+        lines = [f"{self.count} statements, {self.rows} rows:"]
+        for number, (statement, parameters) in enumerate(self.statements, 1):
+            lines.append(f"  {number}. {' '.join(statement.split())}  {parameters!r}")
+        return "\n".join(lines)
+
+    def assert_within(self, max_statements: int, max_rows: Optional[int] = None, label: str = ""):
+        """Fail, listing every statement, if the recorded work is over budget"""
+        over_statements = self.count > max_statements
+        over_rows = max_rows is not None and self.rows > max_rows
+        if over_statements or over_rows:
+            budget = f"{max_statements} statements" + (f", {max_rows} rows" if max_rows is not None else "")
+            raise StatementBudgetExceeded(f"{label} exceeded its budget of {budget}\n{self.report()}".strip())
@@ -1,10 +1,14 @@
 import pytest
-from sqlalchemy import create_engine
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 from app.database import Base
-from app.models.task import Task
+from app.models.task import Task, TaskArchive
+from app.models.task_stats import TaskCounters
 from app.schemas.task import TaskCreate, TaskUpdate
-from app.services import task_service
+from app.services import archive_service, stats_service, task_service
+from tests.statement_budget import StatementRecorder
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -83,3 +87,135 @@ def test_transaction_handling(db):
     assert task.id is not None
     assert task.completed == False
 
+
+def test_get_tasks_paginated_with_fields_skips_description(db):
+    task_service.create_task(db, TaskCreate(title="Sparse", description="Long text"))
+    db.expunge_all()
+
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        items, meta = task_service.get_tasks_paginated(db, fields=("id", "title"))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert meta.total_items == 1
+    assert items[0].title == "Sparse"
+    assert not any("description" in statement for statement in statements)
+
+def test_stats_track_writes(db):
+    task = task_service.create_task(db, TaskCreate(title="Task 1"))
+    task_service.create_task(db, TaskCreate(title="Task 2", completed=True))
+    task_service.update_task(db, task.id, TaskUpdate(completed=True))
+    assert task.completed_at is not None
+
+    stats = stats_service.get_stats(db)
+    assert (stats["total"], stats["completed"], stats["pending"]) == (2, 2, 0)
+    assert sum(day["created"] for day in stats["daily"]) == 2
+    assert sum(day["completed"] for day in stats["daily"]) == 2
+
+    task_service.update_task(db, task.id, TaskUpdate(completed=False))
+    task_service.delete_task(db, task.id)
+
+    stats = stats_service.get_stats(db)
+    assert (stats["total"], stats["completed"], stats["pending"]) == (1, 1, 0)
+    assert sum(day["created"] for day in stats["daily"]) == 1
+
+def test_stats_reconcile(db):
+    task_service.create_task(db, TaskCreate(title="Task 1", completed=True))
+    task_service.create_task(db, TaskCreate(title="Task 2"))
+    db.query(TaskCounters).update({"total": 99, "completed": 99})
+    db.commit()
+
+    counters = stats_service.reconcile(db)
+    assert (counters[0].total, counters[0].completed) == (2, 1)
+    stats = stats_service.get_stats(db)
+    assert sum(day["created"] for day in stats["daily"]) == 2
+    assert sum(day["completed"] for day in stats["daily"]) == 1
+
+def test_stats_upsert_is_one_statement(db):
+    # Creating a missing row and incrementing an existing one are the same
+    # single upsert, so concurrent first writes can't race between them
+    for _ in range(2):
+        other = TestingSessionLocal()
+        try:
+            with StatementRecorder(engine) as recorder:
+                stats_service._bump_counters(other, 7, total=1, completed=1)
+                stats_service._bump_day(other, 7, date.today(), created=1)
+            other.commit()
+        finally:
+            other.close()
+        recorder.assert_within(2, label="counters and day upsert")
+
+    stats = stats_service.get_stats(db, owner_id=7)
+    assert (stats["total"], stats["completed"]) == (2, 2)
+    assert stats["daily"][0]["created"] == 2
+
+def _complete_days_ago(db, task, days):
+    task.completed_at = datetime.now() - timedelta(days=days)
+    db.commit()
+
+def test_archive_completed_tasks(db):
+    old = task_service.create_task(db, TaskCreate(title="Old", completed=True))
+    recent = task_service.create_task(db, TaskCreate(title="Recent", completed=True))
+    pending = task_service.create_task(db, TaskCreate(title="Pending"))
+    _complete_days_ago(db, old, 100)
+    old_id, recent_id, pending_id = old.id, recent.id, pending.id
+
+    moved = archive_service.archive_completed_tasks(db, older_than_days=30, batch_size=1)
+    assert moved == 1
+    assert task_service.get_task(db, old_id) is None
+    assert task_service.get_task(db, recent_id) is not None
+    assert db.query(TaskArchive).one().title == "Old"
+
+    archived = task_service.get_task(db, old_id, include_archived=True)
+    assert archived.title == "Old"
+    tasks = task_service.get_tasks_by_ids(db, [old_id, pending_id], include_archived=True)
+    assert [task.id for task in tasks] == [old_id, pending_id]
+
+    counters = stats_service.get_counters(db)
+    assert (counters.total, counters.completed, counters.archived) == (3, 2, 1)
+    reconciled = stats_service.reconcile(db)
+    assert (reconciled[0].total, reconciled[0].completed, reconciled[0].archived) == (3, 2, 1)
+
+def test_get_tasks_paginated_include_archived(db):
+    for i in range(5):
+        task = task_service.create_task(db, TaskCreate(title=f"Task {i}", completed=i % 2 == 0))
+        if i % 2 == 0:
+            _complete_days_ago(db, task, 100)
+    archive_service.archive_completed_tasks(db, older_than_days=30)
+
+    hot, hot_meta = task_service.get_tasks_paginated(db, page_size=10)
+    assert hot_meta.total_items == 2
+
+    items, meta = task_service.get_tasks_paginated(db, page=2, page_size=2, include_archived=True)
+    assert meta.total_items == 5
+    assert meta.total_pages == 3
+    assert len(items) == 2
+
+    all_items, _ = task_service.get_tasks_paginated(db, page_size=10, include_archived=True)
+    assert [item.title for item in all_items] == [f"Task {i}" for i in reversed(range(5))]
+
+def test_service_statement_budgets(db):
+    task_ids = [task_service.create_task(db, TaskCreate(title=f"Task {i}")).id for i in range(15)]
+    db.expire_all()
+
+    with StatementRecorder(engine) as recorder:
+        task_service.get_task(db, task_ids[0])
+    recorder.assert_within(1, label="get_task")
+
+    with StatementRecorder(engine) as recorder:
+        items, _ = task_service.get_tasks_paginated(db, page=2, page_size=10)
+        [item.title for item in items]
+    recorder.assert_within(2, label="get_tasks_paginated")
+
+    with StatementRecorder(engine) as recorder:
+        task_service.get_completed_count(db)
+    recorder.assert_within(1, label="get_completed_count")
+
+def test_unowned_titles_are_unique(db):
+    task_service.create_task(db, TaskCreate(title="Shared"))
+    with pytest.raises(IntegrityError):
+        task_service.create_task(db, TaskCreate(title="Shared"))
@@ -0,0 +1,261 @@
+import anyio
+import asyncio
+import gzip
+import json
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, get_db
+from app.middleware.compression import select_encoding
+from app.middleware.concurrency import AIMDLimiter, ConcurrencyLimitMiddleware
+from app.middleware.profiling import THREADPOOL_THREAD_NAME, ProfilingMiddleware
+from app.services import task_service
+from app.utils.profiler import SamplingProfiler
+from app.utils.request_context import DeadlineExceeded
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.create_all(bind=engine)
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post("/api-keys/generate", json={"name": "Test Key"})
+    return {"X-API-Key": response.json()["key"]}
+
+def test_select_encoding():
+    assert select_encoding("gzip, deflate", brotli_available=False) == "gzip"
+    assert select_encoding("gzip, br", brotli_available=True) == "br"
+    assert select_encoding("gzip;q=0, br;q=0", brotli_available=True) is None
+    assert select_encoding("identity", brotli_available=True) is None
+    assert select_encoding("*", brotli_available=False) == "gzip"
+
+def test_large_listing_is_gzipped(client, auth_headers):
+    for i in range(20):
+        client.post("/items/", headers=auth_headers, json={
+            "title": f"Task {i}",
+            "description": "long description " * 50
+        })
+
+    response = client.get(
+        "/items/?page_size=100",
+        headers=dict(auth_headers, **{"Accept-Encoding": "gzip"})
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["items"]) == 20
+
+def test_small_response_is_not_compressed(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+def test_identity_is_not_compressed(client, auth_headers):
+    client.post("/items/", headers=auth_headers, json={
+        "title": "Task", "description": "x" * 5000
+    })
+    response = client.get("/items/", headers=dict(auth_headers, **{"Accept-Encoding": "identity"}))
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) > 5000
+
+def test_gzip_body_round_trips(client, auth_headers):
+    client.post("/items/", headers=auth_headers, json={
+        "title": "Task", "description": "y" * 5000
+    })
+    with client.stream("GET", "/items/", headers=dict(auth_headers, **{"Accept-Encoding": "gzip"})) as response:
+        raw = b"".join(response.iter_raw())
+    assert int(response.headers["content-length"]) == len(raw)
+    assert b"y" * 5000 in gzip.decompress(raw)
+
+def test_brotli_body_round_trips(client, auth_headers):
+    brotli = pytest.importorskip("brotli")
+    client.post("/items/", headers=auth_headers, json={
+        "title": "Task", "description": "z" * 5000
+    })
+    with client.stream("GET", "/items/", headers=dict(auth_headers, **{"Accept-Encoding": "br, gzip"})) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert b"z" * 5000 in brotli.decompress(raw)
+
+def test_cache_control_headers(client, auth_headers):
+    create_response = client.post("/items/", headers=auth_headers, json={"title": "Cached"})
+    assert create_response.headers["cache-control"] == "no-store"
+
+    task_id = create_response.json()["id"]
+    read_response = client.get(f"/items/{task_id}", headers=auth_headers)
+    assert read_response.headers["cache-control"] == "private, max-age=0, must-revalidate"
+
+    keys_response = client.get("/api-keys/")
+    assert keys_response.headers["cache-control"] == "no-store"
+
+def test_aimd_limiter_adjusts_limit():
+    limiter = AIMDLimiter("reads", max_limit=10, min_limit=2, initial_limit=4, target_latency=0.05)
+
+    async def cycle(latency):
+        assert await limiter.acquire(timeout=1)
+        limiter.release(latency)
+
+    asyncio.run(cycle(0.2))
+    assert limiter.limit == pytest.approx(3.6)
+    for _ in range(20):
+        asyncio.run(cycle(0.2))
+    assert limiter.limit == 2
+    for _ in range(200):
+        asyncio.run(cycle(0.01))
+    assert limiter.limit == 10
+
+def test_aimd_limiter_cuts_once_per_window():
+    limiter = AIMDLimiter("reads", max_limit=40, target_latency=0.05)
+
+    async def spike():
+        started_at = time.monotonic()
+        for _ in range(40):
+            assert await limiter.acquire(timeout=1)
+        # One latency spike seen by every in-flight request
+        for _ in range(40):
+            limiter.release(0.2, started_at=started_at)
+
+    asyncio.run(spike())
+    assert limiter.limit == pytest.approx(36)
+
+def test_aimd_limiter_queues_then_sheds():
+    limiter = AIMDLimiter("writes", max_limit=1, max_queue=1)
+
+    async def scenario():
+        assert await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire(timeout=1))
+        await asyncio.sleep(0)
+        # Queue is full, so a third request is shed immediately
+        assert await limiter.acquire(timeout=1) is False
+        limiter.release()
+        assert await waiting is True
+        assert limiter.in_flight == 1
+        # Times out waiting behind the request holding the only slot
+        assert await limiter.acquire(timeout=0.01) is False
+
+    asyncio.run(scenario())
+    assert limiter.snapshot() == {"limit": 1, "in_flight": 1, "queued": 0, "rejected": 2}
+
+def test_requests_past_capacity_get_503():
+    async def ok_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = ConcurrencyLimitMiddleware(ok_app, read_limit=1, max_queue=0, retry_after=3)
+    limited_client = TestClient(middleware)
+    assert limited_client.get("/items/").status_code == 200
+
+    middleware.limiters["reads"].in_flight = 1
+    response = limited_client.get("/items/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    # Other route classes and exempt paths are unaffected
+    assert limited_client.post("/items/").status_code == 200
+    assert limited_client.get("/").status_code == 200
+
+def test_expired_deadline_stops_sql(client, auth_headers):
+    response = client.get("/items/", headers=dict(auth_headers, **{"X-Request-Timeout-Ms": "0"}))
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Request deadline exceeded"
+    assert "retry-after" in response.headers
+
+def test_deadline_during_write_is_503(client, auth_headers, monkeypatch):
+    def record_created(db, task):
+        raise DeadlineExceeded("Request deadline exceeded")
+
+    monkeypatch.setattr(task_service, "_record_created", record_created)
+    response = client.post("/items/", headers=auth_headers, json={"title": "Late"})
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+
+def test_deadline_after_commit_still_succeeds(client, auth_headers):
+    def slow_commit(conn):
+        time.sleep(0.4)
+
+    # The deadline passes during COMMIT, before the refresh that follows it
+    event.listen(engine, "commit", slow_commit)
+    try:
+        response = client.post(
+            "/items/", headers=dict(auth_headers, **{"X-Request-Timeout-Ms": "300"}),
+            json={"title": "Committed late"}
+        )
+    finally:
+        event.remove(engine, "commit", slow_commit)
+    assert response.status_code == 201
+    assert response.json()["title"] == "Committed late"
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_sampling_profiler_records_stacks():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.add_thread(threading.get_ident())
+    profiler.start()
+    _spin(0.1)
+    profiler.stop()
+    assert sum(profiler.samples.values()) > 0
+    assert any("_spin (" in line for line in profiler.folded())
+
+def test_profiler_samples_threadpool_threads():
+    # A thread that never registers (e.g. one that runs no SQL) is still sampled by name
+    worker = threading.Thread(target=_spin, args=(0.1,), name=THREADPOOL_THREAD_NAME)
+    profiler = SamplingProfiler(interval=0.001, thread_name=THREADPOOL_THREAD_NAME)
+    profiler.start()
+    worker.start()
+    worker.join()
+    profiler.stop()
+    assert any("_spin (" in line for line in profiler.folded())
+
+def test_threadpool_thread_name():
+    # The profiler finds the threadpool's workers by this name
+    async def worker_name():
+        return await anyio.to_thread.run_sync(lambda: threading.current_thread().name)
+
+    assert asyncio.run(worker_name()) == THREADPOOL_THREAD_NAME
+
+def test_profiled_request_writes_trace(client, auth_headers, tmp_path):
+    client.post("/items/", headers=auth_headers, json={"title": "Profiled"})
+    profiled_client = TestClient(ProfilingMiddleware(app, token="secret", output_dir=str(tmp_path)))
+
+    response = profiled_client.get("/items/", headers=auth_headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert response.json()["items"][0]["title"] == "Profiled"
+
+    response = profiled_client.get("/items/", headers=dict(auth_headers, **{"X-Profile": "wrong"}))
+    assert "x-profile-id" not in response.headers
+
+    # page_size above the first-page snapshot size, so the tasks are queried
+    response = profiled_client.get("/items/?page_size=50", headers=dict(auth_headers, **{"X-Profile": "secret"}))
+    profile_id = response.headers["x-profile-id"]
+    assert response.headers["server-timing"].startswith("db;dur=")
+    trace = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert trace["path"] == "/items/"
+    assert trace["status"] == 200
+    assert trace["other_requests_in_flight"] == 0
+    statements = [entry["statement"] for entry in trace["statements"]]
+    assert any("FROM api_keys" in statement for statement in statements)
+    assert any("FROM tasks" in statement for statement in statements)
+    assert (tmp_path / f"{profile_id}.folded").exists()
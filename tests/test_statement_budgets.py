@@ -0,0 +1,131 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, get_db
+from app.models.task import Task
+from app.services import task_service
+from tests.statement_budget import StatementBudgetExceeded, StatementRecorder
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.create_all(bind=engine)
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post("/api-keys/generate", json={"name": "Test Key"})
+    return {"X-API-Key": response.json()["key"]}
+
+@pytest.fixture
+def task_ids(client, auth_headers):
+    # Enough tasks to fill more than one page, so per-row queries would show
+    return [
+        client.post("/items/", headers=auth_headers, json={"title": f"Task {i}"}).json()["id"]
+        for i in range(12)
+    ]
+
+# Statement budget per endpoint, against a tenant that already has tasks.
+# The API key lookup in verify_api_key is one statement of each budget.
+# Raise a budget only when the extra statement is intended.
+BUDGETS = [
+    ("GET", "/items/{id}", None, 2),
+    ("GET", "/items/", None, 4),  # snapshot miss: version, count, page
+    ("GET", "/items/?completed=false&page=2", None, 3),
+    ("GET", "/items/?fields=id,title", None, 3),
+    ("GET", "/items/?ids={id},{other_id}", None, 2),
+    ("GET", "/items/?include_archived=true", None, 4),
+    ("GET", "/items/stats", None, 3),
+    ("POST", "/items/", {"title": "New task"}, 6),
+    ("PUT", "/items/{id}", {"title": "Renamed"}, 5),
+    ("PUT", "/items/{id}", {"completed": True}, 6),
+    ("DELETE", "/items/{id}", None, 5),
+    ("POST", "/batch", {"operations": [
+        {"op": "create", "data": {"title": "Batch task"}},
+        {"op": "update", "id": "{id}", "data": {"completed": True}},
+        {"op": "delete", "id": "{other_id}"}
+    ]}, 21),
+    ("GET", "/jobs/metrics", None, 1),
+    ("GET", "/api-keys/", None, 1),
+]
+
+def _fill(value, ids):
+    if isinstance(value, str):
+        filled = value.format(**ids)
+        return int(filled) if value.startswith("{") and filled.isdigit() else filled
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    return value
+
+@pytest.mark.parametrize(
+    "method, path, body, max_statements", BUDGETS,
+    ids=[f"{method} {path}" for method, path, *_ in BUDGETS]
+)
+def test_endpoint_statement_budget(client, auth_headers, task_ids, method, path, body, max_statements):
+    ids = {"id": task_ids[0], "other_id": task_ids[1]}
+    with StatementRecorder(engine) as recorder:
+        response = client.request(method, _fill(path, ids), headers=auth_headers, json=_fill(body, ids))
+    assert response.status_code < 400, response.text
+    recorder.assert_within(max_statements, label=f"{method} {path}")
+
+def test_listing_rows_do_not_grow_with_table(client, auth_headers, task_ids):
+    with StatementRecorder(engine) as recorder:
+        response = client.get("/items/?page=2&page_size=5", headers=auth_headers)
+    assert len(response.json()["items"]) == 5
+    # The API key plus one page of tasks
+    recorder.assert_within(3, max_rows=6, label="GET /items/?page=2&page_size=5")
+
+def test_first_page_snapshot_budget(client, auth_headers, task_ids):
+    client.get("/items/", headers=auth_headers)
+    with StatementRecorder(engine) as recorder:
+        response = client.get("/items/", headers=auth_headers)
+    assert len(response.json()["items"]) == 10
+    # The API key and the counters row; tasks come from the snapshot
+    recorder.assert_within(2, max_rows=2, label="GET /items/ (snapshot)")
+
+    # Writes read back the version they commit to update the snapshot in place
+    with StatementRecorder(engine) as recorder:
+        client.put(f"/items/{task_ids[0]}", headers=auth_headers, json={"title": "Renamed"})
+    recorder.assert_within(6, label="PUT /items/{id} (snapshot)")
+
+def test_budget_failure_lists_statements():
+    db = TestingSessionLocal()
+    Base.metadata.create_all(bind=engine)
+    try:
+        with StatementRecorder(engine) as recorder:
+            db.query(Task).all()
+            db.query(Task).count()
+        with pytest.raises(StatementBudgetExceeded) as exc_info:
+            recorder.assert_within(1, label="two queries")
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+    message = str(exc_info.value)
+    assert "two queries exceeded its budget of 1 statements" in message
+    assert "1. SELECT tasks.id" in message
+    assert "2. SELECT count(*)" in message
+
+def test_edit_without_snapshots_skips_counters(client, auth_headers, task_ids, monkeypatch):
+    monkeypatch.setattr(task_service.settings, "first_page_snapshot_enabled", False)
+    with StatementRecorder(engine) as recorder:
+        client.put(f"/items/{task_ids[0]}", headers=auth_headers, json={"title": "Renamed"})
+    # Nothing reads the version, so a title edit leaves task_counters alone
+    assert not any("task_counters" in statement for statement, _ in recorder.statements)
+    recorder.assert_within(4, label="PUT /items/{id} (snapshots disabled)")
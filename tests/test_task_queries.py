@@ -0,0 +1,279 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, get_db
+from app.models.task import Task
+from app.models.task_stats import TaskCounters
+from app.services import archive_service, stats_service
+from app.services.first_page_cache import FirstPageCache, first_pages
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.create_all(bind=engine)
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post("/api-keys/generate", json={"name": "Test Key"})
+    return {"X-API-Key": response.json()["key"]}
+
+def test_read_tasks_with_fields(client, auth_headers):
+    client.post("/items/", headers=auth_headers, json={"title": "Task 1", "description": "Long"})
+    client.post("/items/", headers=auth_headers, json={"title": "Task 2", "description": "Long"})
+
+    response = client.get("/items/?fields=title,completed", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pagination"]["total_items"] == 2
+    for item in data["items"]:
+        assert set(item) == {"id", "title", "completed"}
+    assert response.headers["cache-control"] == "private, max-age=0, must-revalidate"
+
+def test_read_single_task_with_fields(client, auth_headers):
+    task_id = client.post("/items/", headers=auth_headers, json={
+        "title": "Single Task", "description": "Long"
+    }).json()["id"]
+
+    response = client.get(f"/items/{task_id}?fields=title", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": task_id, "title": "Single Task"}
+
+def test_read_tasks_with_unknown_field(client, auth_headers):
+    response = client.get("/items/?fields=title,secret", headers=auth_headers)
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+def test_read_task_stats(client, auth_headers):
+    client.post("/items/", headers=auth_headers, json={"title": "Task 1", "completed": True})
+    client.post("/items/", headers=auth_headers, json={"title": "Task 2"})
+    client.post("/items/", headers=auth_headers, json={"title": "Task 3"})
+
+    response = client.get("/items/stats", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["completed"], data["pending"]) == (3, 1, 2)
+    assert len(data["daily"]) == 1
+    assert data["daily"][0]["created"] == 3
+    assert data["daily"][0]["completed"] == 1
+
+def test_read_tasks_by_ids(client, auth_headers):
+    ids = [
+        client.post("/items/", headers=auth_headers, json={"title": f"Task {i}"}).json()["id"]
+        for i in range(3)
+    ]
+
+    response = client.get(f"/items/?ids={ids[2]},{ids[0]},9999", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [ids[2], ids[0]]
+    assert data["pagination"]["total_items"] == 2
+
+def test_read_tasks_by_invalid_ids(client, auth_headers):
+    response = client.get("/items/?ids=1,abc", headers=auth_headers)
+    assert response.status_code == 400
+
+def test_batch_operations(client, auth_headers):
+    existing_id = client.post("/items/", headers=auth_headers, json={"title": "Existing"}).json()["id"]
+
+    response = client.post("/batch", headers=auth_headers, json={"operations": [
+        {"op": "create", "data": {"title": "Batch Task"}},
+        {"op": "create", "data": {"title": "Existing"}},
+        {"op": "create", "data": {"title": ""}},
+        {"op": "get", "id": existing_id},
+        {"op": "update", "id": existing_id, "data": {"completed": True}},
+        {"op": "get", "id": 9999},
+        {"op": "delete"},
+        {"op": "delete", "id": existing_id}
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [201, 400, 422, 200, 200, 404, 422, 204]
+    assert results[0]["body"]["title"] == "Batch Task"
+    assert results[4]["body"]["completed"] is True
+
+    listing = client.get("/items/", headers=auth_headers).json()
+    assert [item["title"] for item in listing["items"]] == ["Batch Task"]
+    stats = client.get("/items/stats", headers=auth_headers).json()
+    assert (stats["total"], stats["completed"]) == (1, 0)
+
+def test_batch_requires_api_key(client):
+    response = client.post("/batch", json={"operations": [{"op": "get", "id": 1}]})
+    assert response.status_code == 401
+
+def test_tasks_are_scoped_to_api_key(client, auth_headers):
+    other_headers = {"X-API-Key": client.post("/api-keys/generate", json={"name": "Other"}).json()["key"]}
+
+    mine = client.post("/items/", headers=auth_headers, json={"title": "Shared Title"})
+    theirs = client.post("/items/", headers=other_headers, json={"title": "Shared Title", "completed": True})
+    assert mine.status_code == 201
+    assert theirs.status_code == 201
+
+    duplicate = client.post("/items/", headers=auth_headers, json={"title": "Shared Title"})
+    assert duplicate.status_code == 400
+
+    listing = client.get("/items/", headers=auth_headers).json()
+    assert [item["id"] for item in listing["items"]] == [mine.json()["id"]]
+    assert listing["pagination"]["total_items"] == 1
+
+    theirs_id = theirs.json()["id"]
+    assert client.get(f"/items/{theirs_id}", headers=auth_headers).status_code == 404
+    assert client.put(f"/items/{theirs_id}", headers=auth_headers, json={"title": "Taken"}).status_code == 404
+    assert client.delete(f"/items/{theirs_id}", headers=auth_headers).status_code == 404
+    assert client.get(f"/items/?ids={theirs_id}", headers=auth_headers).json()["items"] == []
+
+    my_stats = client.get("/items/stats", headers=auth_headers).json()
+    their_stats = client.get("/items/stats", headers=other_headers).json()
+    assert (my_stats["total"], my_stats["completed"]) == (1, 0)
+    assert (their_stats["total"], their_stats["completed"]) == (1, 1)
+
+def test_read_archived_tasks(client, auth_headers):
+    task_id = client.post("/items/", headers=auth_headers, json={
+        "title": "Archived", "description": "Old", "completed": True
+    }).json()["id"]
+    client.post("/items/", headers=auth_headers, json={"title": "Active"})
+
+    db = TestingSessionLocal()
+    try:
+        db.query(Task).filter(Task.id == task_id).update(
+            {"completed_at": datetime.now() - timedelta(days=365)}
+        )
+        db.commit()
+        assert archive_service.archive_completed_tasks(db, older_than_days=90) == 1
+    finally:
+        db.close()
+
+    assert client.get(f"/items/{task_id}", headers=auth_headers).status_code == 404
+    archived = client.get(f"/items/{task_id}?include_archived=true&fields=title", headers=auth_headers)
+    assert archived.json() == {"id": task_id, "title": "Archived"}
+
+    listing = client.get("/items/", headers=auth_headers).json()
+    assert [item["title"] for item in listing["items"]] == ["Active"]
+    listing = client.get("/items/?include_archived=true", headers=auth_headers).json()
+    assert [item["title"] for item in listing["items"]] == ["Active", "Archived"]
+    assert listing["items"][1]["description"] == "Old"
+
+def _assert_first_pages_match_database(client, auth_headers):
+    for query in ("", "completed=true", "completed=false"):
+        first_page = client.get(f"/items/?{query}", headers=auth_headers)
+        assert first_page.headers["cache-control"] == "private, max-age=0, must-revalidate"
+        from_database = client.get(f"/items/?{query}&page_size=100", headers=auth_headers).json()
+        assert first_page.json()["items"] == from_database["items"][:10]
+        assert first_page.json()["pagination"]["total_items"] == from_database["pagination"]["total_items"]
+
+def test_first_page_snapshot_stays_consistent(client, auth_headers):
+    ids = [
+        client.post("/items/", headers=auth_headers, json={"title": f"Task {i}", "completed": i % 3 == 0}).json()["id"]
+        for i in range(14)
+    ]
+    _assert_first_pages_match_database(client, auth_headers)
+
+    client.post("/items/", headers=auth_headers, json={"title": "Newest"})
+    _assert_first_pages_match_database(client, auth_headers)
+    client.put(f"/items/{ids[-1]}", headers=auth_headers, json={"completed": True})
+    _assert_first_pages_match_database(client, auth_headers)
+    client.put(f"/items/{ids[-3]}", headers=auth_headers, json={"completed": False})
+    _assert_first_pages_match_database(client, auth_headers)
+    client.put(f"/items/{ids[-2]}", headers=auth_headers, json={"description": "Edited"})
+    _assert_first_pages_match_database(client, auth_headers)
+    client.delete(f"/items/{ids[-4]}", headers=auth_headers)
+    _assert_first_pages_match_database(client, auth_headers)
+
+    # Batches commit once at the end and are not applied in place
+    client.post("/batch", headers=auth_headers, json={"operations": [
+        {"op": "create", "data": {"title": "From batch", "completed": True}},
+        {"op": "delete", "id": ids[-5]}
+    ]})
+    _assert_first_pages_match_database(client, auth_headers)
+
+    # A write made by another process only shows up as a newer version
+    db = TestingSessionLocal()
+    try:
+        task = db.get(Task, ids[-2])
+        task.title = "Renamed elsewhere"
+        stats_service.record_changed(db, task)
+        db.commit()
+    finally:
+        db.close()
+    _assert_first_pages_match_database(client, auth_headers)
+    titles = [item["title"] for item in client.get("/items/", headers=auth_headers).json()["items"]]
+    assert "Renamed elsewhere" in titles
+
+def _tasks(count, description=None):
+    created_at = datetime(2024, 1, 1)
+    return [
+        Task(id=i, title=f"Task {i}", description=description, completed=False, created_at=created_at + timedelta(minutes=i))
+        for i in range(count, 0, -1)
+    ]
+
+def test_first_page_snapshot_evicts_by_bytes():
+    tasks = _tasks(3)
+    cache = FirstPageCache(size=10, max_bytes=1)
+    bodies = cache.put(1, 1, None, tasks, 3)
+    cache.max_bytes = 3 * sum(len(body) for body in bodies)
+
+    for owner_id in (1, 2, 3):
+        cache.put(owner_id, 1, None, tasks, 3)
+    assert cache.get(1, 1, None) == (bodies, 3)
+    cache.put(4, 1, None, tasks, 3)
+    # Owner 2 was the least recently used
+    assert cache.get(2, 1, None) is None
+    assert [cache.get(owner_id, 1, None) is not None for owner_id in (1, 3, 4)] == [True, True, True]
+    assert cache.nbytes <= cache.max_bytes
+
+    cache.apply_deleted(4, 3, False, 2)
+    assert cache.get(4, 2, None) == (bodies[1:], 2)
+    assert cache.nbytes == 2 * sum(len(body) for body in bodies) + len(bodies[1]) + len(bodies[2])
+
+def test_first_page_snapshot_skips_large_tasks():
+    cache = FirstPageCache(size=10, max_entry_bytes=1000)
+    bodies = cache.put(1, 1, None, _tasks(2, description="x" * 1000), 2)
+    assert len(bodies) == 2
+    assert cache.get(1, 1, None) is None
+    assert cache.nbytes == 0
+
+    cache.put(1, 1, None, _tasks(2), 2)
+    task = _tasks(3, description="x" * 1000)[0]
+    task.owner_key_id = 1
+    cache.apply_created(task, 2)
+    assert not cache.has_owner(1)
+    assert cache.nbytes == 0
+
+def test_first_page_serves_large_tasks_from_database(client, auth_headers):
+    first_pages.clear()
+    client.post("/items/", headers=auth_headers, json={"title": "Short"})
+    client.post("/items/", headers=auth_headers, json={"title": "Long", "description": "x" * (first_pages.max_entry_bytes + 1)})
+    _assert_first_pages_match_database(client, auth_headers)
+    client.post("/items/", headers=auth_headers, json={"title": "Newest"})
+    _assert_first_pages_match_database(client, auth_headers)
+    assert first_pages.nbytes == 0
+
+def test_first_page_total_ignores_counter_drift(client, auth_headers):
+    for i in range(3):
+        client.post("/items/", headers=auth_headers, json={"title": f"Task {i}", "completed": i == 0})
+    db = TestingSessionLocal()
+    try:
+        db.query(TaskCounters).update({TaskCounters.total: 100, TaskCounters.completed: 50})
+        db.commit()
+    finally:
+        db.close()
+    _assert_first_pages_match_database(client, auth_headers)
+    client.post("/items/", headers=auth_headers, json={"title": "Newest"})
+    _assert_first_pages_match_database(client, auth_headers)
+    assert client.get("/items/", headers=auth_headers).json()["pagination"]["total_items"] == 4